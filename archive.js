@@ -1,6 +1,10 @@
 // 全局变量
 let currentLanguage = 'en'; // 默认语言为英文
-let releasesData = null;
+let archiveIndex = null; // 静态归档清单 data/archive/index.json
+let releaseDays = {}; // 清单中没有的日期 -> 语言（来自GitHub Releases API，只有下载链接）
+const monthShards = {}; // 月份 -> 分片数据（展开标题时按需加载）
+const RELEASE_DOWNLOAD_BASE = 'https://github.com/your-username/AI_news/releases/download';
+const RELEASES_API = 'https://api.github.com/repos/your-username/AI_news/releases?per_page=100';
 
 // 页面加载完成后执行
 document.addEventListener('DOMContentLoaded', function() {
@@ -18,8 +22,8 @@ document.addEventListener('DOMContentLoaded', function() {
         changeLanguage('zh');
     });
     
-    // 加载GitHub Releases数据
-    fetchAllReleases();
+    // 加载静态归档清单
+    fetchArchiveIndex();
 });
 
 // 更改页面语言
@@ -70,24 +74,31 @@ function updateUIText() {
     document.title = textElements['main-title'][currentLanguage];
 }
 
-// 获取所有GitHub Releases数据
-async function fetchAllReleases() {
+// 获取静态归档清单（由流水线预先生成）；清单尚未回填历史Release时再用Releases API补充
+async function fetchArchiveIndex() {
     try {
-        const response = await fetch('https://api.github.com/repos/your-username/AI_news/releases');
-        if (!response.ok) {
-            throw new Error('Failed to fetch releases');
+        try {
+            const response = await fetch('data/archive/index.json');
+            if (!response.ok) {
+                throw new Error('Failed to fetch archive index');
+            }
+            archiveIndex = await response.json();
+        } catch (error) {
+            console.error('Error fetching archive index:', error);
         }
         
-        releasesData = await response.json();
+        if (!archiveIndex || !archiveIndex.complete) {
+            await fetchReleaseDays();
+        }
         
-        // 如果有发布数据，渲染归档页面
-        if (releasesData && releasesData.length > 0) {
+        // 如果有存档数据，渲染归档页面
+        if (getArchiveDates().length > 0) {
             renderArchive();
         } else {
             showNoArchiveMessage();
         }
     } catch (error) {
-        console.error('Error fetching releases:', error);
+        console.error('Error fetching archive index:', error);
         showNoArchiveMessage();
     } finally {
         // 隐藏加载指示器
@@ -95,12 +106,54 @@ async function fetchAllReleases() {
     }
 }
 
+// 从GitHub Releases获取清单中没有的日期及其语言
+async function fetchReleaseDays() {
+    try {
+        const response = await fetch(RELEASES_API);
+        if (!response.ok) {
+            throw new Error('Failed to fetch releases');
+        }
+        
+        const releases = await response.json();
+        releases.forEach(release => {
+            const dateMatch = (release.name || '').match(/AI News (\d{4}-\d{2}-\d{2})/);
+            if (!dateMatch || getManifestDay(dateMatch[1])) return;
+            
+            const date = dateMatch[1];
+            const assets = (release.assets || []).map(asset => asset.name);
+            const languages = {};
+            if (assets.length === 0 || assets.some(name => name.startsWith(`ai_news_${date}.`))) languages.en = null;
+            if (assets.length === 0 || assets.some(name => name.startsWith(`ai_news_cn_${date}.`))) languages.zh = null;
+            releaseDays[date] = languages;
+        });
+    } catch (error) {
+        console.error('Error fetching releases:', error);
+    }
+}
+
+// 清单中某天的语言 -> 文章数，不存在时返回undefined
+function getManifestDay(date) {
+    if (!archiveIndex || !archiveIndex.months) return undefined;
+    return (archiveIndex.months[date.slice(0, 7)] || {})[date];
+}
+
+// 清单和Releases中的所有日期，最新的在前
+function getArchiveDates() {
+    const manifestDates = archiveIndex && archiveIndex.months
+        ? Object.values(archiveIndex.months).flatMap(days => Object.keys(days))
+        : [];
+    return [...new Set([...manifestDates, ...Object.keys(releaseDays)])]
+        .sort()
+        .reverse();
+}
+
 // 渲染归档列表
 function renderArchive() {
     const archiveContainer = document.getElementById('archive-container');
     archiveContainer.innerHTML = ''; // 清空容器
     
-    if (!releasesData || releasesData.length === 0) {
+    const dates = getArchiveDates();
+    if (dates.length === 0) {
         showNoArchiveMessage();
         return;
     }
@@ -108,38 +161,82 @@ function renderArchive() {
     // 隐藏"无存档"消息
     document.getElementById('no-archive').classList.add('d-none');
     
-    // 按日期排序，最新的在前
-    const sortedReleases = [...releasesData].sort((a, b) => 
-        new Date(b.published_at) - new Date(a.published_at)
-    );
-    
-    // 渲染每个发布
-    sortedReleases.forEach(release => {
-        // 从发布名称中提取日期
-        const dateMatch = release.name.match(/AI News (\d{4}-\d{2}-\d{2})/);
-        if (!dateMatch || !dateMatch[1]) return; // 跳过格式不匹配的发布
-        
-        const releaseDate = dateMatch[1];
-        const formattedDate = formatDate(releaseDate);
+    // 渲染每一天
+    dates.forEach(date => {
+        const formattedDate = formatDate(date);
+        const manifestDay = getManifestDay(date);
         
         // 创建归档项
         const archiveItem = document.createElement('div');
         archiveItem.className = 'archive-item';
         
-        // 为归档项添加日期和下载链接
+        // 为归档项添加日期、标题展开按钮（仅清单中的日期有标题分片）和下载链接
+        const toggleButton = manifestDay ? `
+                <button type="button" class="btn btn-sm btn-outline-primary archive-toggle" title="${currentLanguage === 'en' ? 'Headlines' : '标题'}">
+                    <i class="bi bi-list-ul"></i>
+                    <span class="d-none d-md-inline">${currentLanguage === 'en' ? 'Headlines' : '标题'}</span>
+                </button>` : '';
         archiveItem.innerHTML = `
             <div class="archive-date">${formattedDate}</div>
             <div class="archive-links">
-                ${createArchiveLinks(release, releaseDate)}
+                ${toggleButton}
+                ${createArchiveLinks(date, manifestDay || releaseDays[date])}
             </div>
         `;
         
         archiveContainer.appendChild(archiveItem);
+        if (manifestDay) {
+            const headlines = document.createElement('ul');
+            headlines.className = 'archive-headlines d-none';
+            archiveItem.querySelector('.archive-toggle').addEventListener('click', () => toggleHeadlines(date, headlines));
+            archiveContainer.appendChild(headlines);
+        }
     });
 }
 
-// 创建归档项的下载链接
-function createArchiveLinks(release, date) {
+// 展开或收起某天的新闻标题，所在月份的分片只下载一次
+async function toggleHeadlines(date, list) {
+    if (!list.classList.contains('d-none')) {
+        list.classList.add('d-none');
+        return;
+    }
+    
+    const month = date.slice(0, 7);
+    try {
+        if (!monthShards[month]) {
+            const response = await fetch(`data/archive/${month}.json`);
+            if (!response.ok) {
+                throw new Error(`Failed to fetch archive shard ${month}`);
+            }
+            monthShards[month] = await response.json();
+        }
+    } catch (error) {
+        console.error('Error fetching archive shard:', error);
+        return;
+    }
+    
+    const day = monthShards[month][date] || {};
+    const articles = day[currentLanguage] || day.en || [];
+    list.innerHTML = articles.map(article => `
+        <li>
+            <a href="${escapeHtml(article.url || '#')}" target="_blank" rel="noopener">${escapeHtml(article.title || '')}</a>
+            <span class="text-muted small">${escapeHtml(article.source || '')}</span>
+        </li>
+    `).join('');
+    list.classList.remove('d-none');
+}
+
+// 转义HTML特殊字符
+function escapeHtml(text) {
+    return String(text)
+        .replace(/&/g, '&amp;')
+        .replace(/</g, '&lt;')
+        .replace(/>/g, '&gt;')
+        .replace(/"/g, '&quot;');
+}
+
+// 创建归档项的下载链接（指向当天Release的附件），只列出清单中存在的语言
+function createArchiveLinks(date, languages) {
     const fileTypes = [
         { type: 'pdf-en', icon: 'bi-file-earmark-pdf', label: { en: 'PDF (EN)', zh: 'PDF (英)' }, file: `ai_news_${date}.pdf` },
         { type: 'pdf-zh', icon: 'bi-file-earmark-pdf', label: { en: 'PDF (ZH)', zh: 'PDF (中)' }, file: `ai_news_cn_${date}.pdf` },
@@ -148,19 +245,17 @@ function createArchiveLinks(release, date) {
         { type: 'json-en', icon: 'bi-file-earmark-code', label: { en: 'JSON (EN)', zh: 'JSON (英)' }, file: `ai_news_${date}.json` },
         { type: 'json-zh', icon: 'bi-file-earmark-code', label: { en: 'JSON (ZH)', zh: 'JSON (中)' }, file: `ai_news_cn_${date}.json` }
     ];
+    const tag = `v${date.replace(/-/g, '')}`;
     
     // 为每种文件类型创建链接
-    return fileTypes.map(fileType => {
-        const asset = release.assets.find(a => a.name === fileType.file);
-        if (!asset) return '';
-        
-        return `
-            <a href="${asset.browser_download_url}" target="_blank" class="btn btn-sm btn-outline-secondary" title="${fileType.label[currentLanguage]}">
+    return fileTypes
+        .filter(fileType => languages[fileType.type.endsWith('-en') ? 'en' : 'zh'] !== undefined)
+        .map(fileType => `
+            <a href="${RELEASE_DOWNLOAD_BASE}/${tag}/${fileType.file}" target="_blank" class="btn btn-sm btn-outline-secondary" title="${fileType.label[currentLanguage]}">
                 <i class="${fileType.icon}"></i>
                 <span class="d-none d-md-inline">${fileType.label[currentLanguage]}</span>
             </a>
-        `;
-    }).join('');
+        `).join('');
 }
 
 // 格式化日期显示
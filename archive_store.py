@@ -0,0 +1,393 @@
+"""
+新闻简报归档库：把每天的简报写入本地SQLite，按日期、来源、关键词和评分查询历史文章，
+并对标题和描述建立全文索引，不必逐个打开 ai_news_*.json 文件
+
+使用方法:
+    python archive_store.py import ai_news_2025-01-01.json ai_news_cn_2025-01-01.json ...
+    python archive_store.py query [--from 日期] [--to 日期] [--source 来源] [--keyword 关键词] [--lang en|zh]
+    python archive_store.py search "DeepSeek-R1" [--lang en|zh] [--from 日期] [--to 日期]
+    python archive_store.py import-releases [--repo owner/name]   # 从GitHub Release附件回填历史简报
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+from datetime import datetime
+
+ARCHIVE_DB_PATH = os.environ.get("ARCHIVE_DB_PATH", "news_archive.db")  # 归档库路径，设为空字符串则不归档
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com")  # 回填历史简报时使用的GitHub API地址
+
+_FILENAME_PATTERN = re.compile(r"ai_news_(cn_)?(\d{4}-\d{2}-\d{2})\.json$")
+
+# 中日韩文字没有空格分词，写入全文索引前逐字切开，查询时按相邻字组成的短语匹配
+_CJK_PATTERN = re.compile(r"([\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af])")
+
+
+def segment_text(text):
+    """在每个中日韩字符两侧加空格，使FTS5的unicode61分词器把它们作为单独的词"""
+    return _CJK_PATTERN.sub(r" \1 ", text or "")
+
+
+def build_match_query(text):
+    """
+    把用户输入转换为FTS5查询：每个空格分隔的词作为一个短语，多个词之间为AND
+
+    例如 DeepSeek-R1 -> "deepseek r1"，深度学习 -> "深 度 学 习"
+    """
+    phrases = []
+    for term in text.split():
+        tokens = re.findall(r"\w+", segment_text(term))
+        if tokens:
+            phrases.append('"' + " ".join(tokens) + '"')
+    return " ".join(phrases)
+
+
+def digest_from_filename(path):
+    """由简报文件名推断 (日期, 语言)，无法识别时返回None"""
+    match = _FILENAME_PATTERN.search(os.path.basename(path))
+    if not match:
+        return None
+    return match.group(2), "zh" if match.group(1) else "en"
+
+
+def _article_keywords(article, keywords):
+    """文章标题、描述和链接中出现的热门关键词（小写）"""
+    text = " ".join((article.get(field) or "") for field in ("title", "description", "url")).lower()
+    return {keyword for keyword in keywords if keyword and keyword in text}
+
+
+class ArchiveStore:
+    """
+    简报归档库（SQLite）
+
+    每个 (日期, 语言) 一份简报，重复写入同一天时整体替换；
+    文章表按日期、来源和评分建索引，关键词单独建表以便按关键词查询；
+    标题和描述写入FTS5全文索引，与文章表在同一事务中增量更新
+    """
+
+    def __init__(self, path=None):
+        self.path = path or ARCHIVE_DB_PATH
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS digests ("
+                "date TEXT NOT NULL, language TEXT NOT NULL, hot_keywords TEXT, archived_at TEXT NOT NULL, "
+                "PRIMARY KEY (date, language))"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS articles ("
+                "id INTEGER PRIMARY KEY, date TEXT NOT NULL, language TEXT NOT NULL, rank INTEGER NOT NULL, "
+                "title TEXT, description TEXT, url TEXT, url_to_image TEXT, source TEXT, source_key TEXT, "
+                "published_at TEXT, score REAL)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_date ON articles(date, language)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source_key, date)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_score ON articles(score)")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS article_keywords ("
+                "keyword TEXT NOT NULL, article_id INTEGER NOT NULL, PRIMARY KEY (keyword, article_id)"
+                ") WITHOUT ROWID"
+            )
+            # 全文索引，rowid与articles.id一致，随简报写入增量更新
+            has_fts = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'articles_fts'"
+            ).fetchone() is not None
+            if not has_fts:
+                self.conn.execute("CREATE VIRTUAL TABLE articles_fts USING fts5(title, description)")
+                # 建立索引前已归档的文章只需补录一次
+                self.conn.executemany(
+                    "INSERT INTO articles_fts (rowid, title, description) VALUES (?, ?, ?)",
+                    ((row["id"], segment_text(row["title"]), segment_text(row["description"]))
+                     for row in self.conn.execute("SELECT id, title, description FROM articles").fetchall())
+                )
+
+    def add_digest(self, date, language, data):
+        """
+        写入一份简报（同一日期和语言已存在时替换）
+
+        Args:
+            date: 简报日期 YYYY-MM-DD
+            language: 语言代码，en 或 zh
+            data: 简报JSON内容，包含 articles 和 hot_keywords
+
+        Returns:
+            写入的文章数
+        """
+        articles = data.get("articles") or []
+        hot_keywords = data.get("hot_keywords") or {}
+        keywords = [k.lower() for k in hot_keywords.get("keywords", []) if isinstance(k, str)]
+
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM article_keywords WHERE article_id IN "
+                "(SELECT id FROM articles WHERE date = ? AND language = ?)", (date, language)
+            )
+            self.conn.execute(
+                "DELETE FROM articles_fts WHERE rowid IN "
+                "(SELECT id FROM articles WHERE date = ? AND language = ?)", (date, language)
+            )
+            self.conn.execute("DELETE FROM articles WHERE date = ? AND language = ?", (date, language))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO digests (date, language, hot_keywords, archived_at) VALUES (?, ?, ?, ?)",
+                (date, language, json.dumps(hot_keywords, ensure_ascii=False), datetime.now().isoformat())
+            )
+            for rank, article in enumerate(articles):
+                source = (article.get("source") or {}).get("name") or ""
+                article_id = self.conn.execute(
+                    "INSERT INTO articles (date, language, rank, title, description, url, url_to_image, "
+                    "source, source_key, published_at, score) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (date, language, rank, article.get("title"), article.get("description"), article.get("url"),
+                     article.get("urlToImage"), source, source.strip().lower(), article.get("publishedAt"),
+                     article.get("score"))
+                ).lastrowid
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO article_keywords (keyword, article_id) VALUES (?, ?)",
+                    ((keyword, article_id) for keyword in _article_keywords(article, keywords))
+                )
+                self.conn.execute(
+                    "INSERT INTO articles_fts (rowid, title, description) VALUES (?, ?, ?)",
+                    (article_id, segment_text(article.get("title")), segment_text(article.get("description")))
+                )
+        return len(articles)
+
+    def list_dates(self, language="en"):
+        """已归档简报的日期，从新到旧"""
+        rows = self.conn.execute(
+            "SELECT date FROM digests WHERE language = ? ORDER BY date DESC", (language,)
+        ).fetchall()
+        return [row["date"] for row in rows]
+
+    def get_digest(self, date, language="en"):
+        """读取一份简报，格式与 ai_news_*.json 相同，不存在时返回None"""
+        digest = self.conn.execute(
+            "SELECT hot_keywords FROM digests WHERE date = ? AND language = ?", (date, language)
+        ).fetchone()
+        if digest is None:
+            return None
+        rows = self.conn.execute(
+            "SELECT * FROM articles WHERE date = ? AND language = ? ORDER BY rank", (date, language)
+        ).fetchall()
+        return {
+            "articles": [self._to_article(row) for row in rows],
+            "hot_keywords": json.loads(digest["hot_keywords"] or "{}")
+        }
+
+    def query(self, start_date=None, end_date=None, source=None, keyword=None, language="en",
+              min_score=None, limit=None):
+        """
+        查询归档文章
+
+        Args:
+            start_date: 起始日期（含）
+            end_date: 结束日期（含）
+            source: 来源名，不区分大小写的完全匹配
+            keyword: 热门关键词，不区分大小写
+            language: 语言代码
+            min_score: 最低评分
+            limit: 最多返回的文章数
+
+        Returns:
+            文章列表（附带 date 字段），按日期从新到旧、同一天按简报中的顺序
+        """
+        sql = "SELECT a.* FROM articles a"
+        conditions = ["a.language = ?"]
+        params = [language]
+        if keyword:
+            sql += " JOIN article_keywords k ON k.article_id = a.id"
+            conditions.append("k.keyword = ?")
+            params.append(keyword.lower())
+        if start_date:
+            conditions.append("a.date >= ?")
+            params.append(start_date)
+        if end_date:
+            conditions.append("a.date <= ?")
+            params.append(end_date)
+        if source:
+            conditions.append("a.source_key = ?")
+            params.append(source.strip().lower())
+        if min_score is not None:
+            conditions.append("a.score >= ?")
+            params.append(min_score)
+        sql += " WHERE " + " AND ".join(conditions) + " ORDER BY a.date DESC, a.rank"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(self._to_article(row), date=row["date"]) for row in self.conn.execute(sql, params)]
+
+    def search(self, text, language=None, start_date=None, end_date=None, limit=20):
+        """
+        全文检索标题和描述
+
+        Args:
+            text: 查询词，空格分隔的多个词须同时出现；中文按相邻字匹配
+            language: 语言代码，None表示不限
+            start_date: 起始日期（含）
+            end_date: 结束日期（含）
+            limit: 最多返回的文章数
+
+        Returns:
+            按相关度排序的文章列表（附带 date 和 language 字段），标题命中的权重高于描述
+        """
+        match = build_match_query(text)
+        if not match:
+            return []
+        sql = ("SELECT a.* FROM articles_fts f JOIN articles a ON a.id = f.rowid "
+               "WHERE articles_fts MATCH ?")
+        params = [match]
+        if language:
+            sql += " AND a.language = ?"
+            params.append(language)
+        if start_date:
+            sql += " AND a.date >= ?"
+            params.append(start_date)
+        if end_date:
+            sql += " AND a.date <= ?"
+            params.append(end_date)
+        sql += " ORDER BY bm25(articles_fts, 2.0, 1.0), a.date DESC LIMIT ?"
+        params.append(limit)
+        return [dict(self._to_article(row), date=row["date"], language=row["language"])
+                for row in self.conn.execute(sql, params)]
+
+    @staticmethod
+    def _to_article(row):
+        article = {
+            "title": row["title"],
+            "description": row["description"],
+            "url": row["url"],
+            "urlToImage": row["url_to_image"],
+            "source": {"name": row["source"]},
+            "publishedAt": row["published_at"]
+        }
+        if row["score"] is not None:
+            article["score"] = row["score"]
+        return article
+
+    def close(self):
+        self.conn.close()
+
+
+def append_digest(date, language, data):
+    """流水线调用：把刚生成的简报写入归档库，失败只记录日志"""
+    if not ARCHIVE_DB_PATH:
+        return
+    try:
+        store = ArchiveStore()
+        try:
+            count = store.add_digest(date, language, data)
+        finally:
+            store.close()
+        print(f"已归档 {date} ({language}) 简报 {count} 篇文章到 {ARCHIVE_DB_PATH}")
+    except sqlite3.Error as e:
+        logging.error(f"写入归档库失败: {e}")
+
+
+def import_releases(store, repo, token=None):
+    """
+    下载GitHub Release中附带的 ai_news_*.json 并写入归档库，已归档的日期和语言不重复下载
+
+    归档库和静态归档数据只保存在可能被清除的Actions缓存中，Release附件是历史简报的持久来源
+
+    Returns:
+        导入的简报数
+    """
+    import http_client
+
+    session = http_client.get_session()
+    headers = {"Accept": "application/vnd.github+json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    archived = {(date, language) for language in ("en", "zh") for date in store.list_dates(language)}
+
+    imported = 0
+    page = 1
+    while True:
+        response = session.get(f"{GITHUB_API_URL}/repos/{repo}/releases", headers=headers,
+                               params={"per_page": 100, "page": page}, timeout=30)
+        response.raise_for_status()
+        releases = response.json()
+        if not releases:
+            break
+        for release in releases:
+            for asset in release.get("assets") or []:
+                digest = digest_from_filename(asset.get("name") or "")
+                if digest is None or digest in archived:
+                    continue
+                asset_response = session.get(asset["browser_download_url"], timeout=60)
+                asset_response.raise_for_status()
+                try:
+                    data = asset_response.json()
+                except ValueError:
+                    data = None
+                if not isinstance(data, dict):
+                    print(f"跳过无法解析的附件: {asset['name']}")
+                    continue
+                count = store.add_digest(*digest, data)
+                archived.add(digest)
+                imported += 1
+                print(f"已从Release导入 {asset['name']}: {count} 篇文章")
+        page += 1
+    return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="新闻简报归档库")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="导入已有的简报JSON文件")
+    import_parser.add_argument("files", nargs="+")
+
+    query_parser = subparsers.add_parser("query", help="查询归档文章")
+    query_parser.add_argument("--from", dest="start_date")
+    query_parser.add_argument("--to", dest="end_date")
+    query_parser.add_argument("--source")
+    query_parser.add_argument("--keyword")
+    query_parser.add_argument("--lang", default="en")
+    query_parser.add_argument("--limit", type=int)
+
+    releases_parser = subparsers.add_parser("import-releases", help="从GitHub Release附件回填历史简报")
+    releases_parser.add_argument("--repo", default=os.environ.get("GITHUB_REPOSITORY"), help="owner/name，默认GITHUB_REPOSITORY")
+
+    search_parser = subparsers.add_parser("search", help="全文检索标题和描述")
+    search_parser.add_argument("text")
+    search_parser.add_argument("--lang")
+    search_parser.add_argument("--from", dest="start_date")
+    search_parser.add_argument("--to", dest="end_date")
+    search_parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    store = ArchiveStore()
+    try:
+        if args.command == "import":
+            for path in args.files:
+                digest = digest_from_filename(path)
+                if digest is None:
+                    print(f"跳过无法识别日期的文件: {path}")
+                    continue
+                with open(path, 'r', encoding='utf-8') as f:
+                    count = store.add_digest(*digest, json.load(f))
+                print(f"已导入 {path}: {count} 篇文章")
+        elif args.command == "import-releases":
+            if not args.repo:
+                parser.error("需要 --repo 或 GITHUB_REPOSITORY")
+            count = import_releases(store, args.repo, os.environ.get("GITHUB_TOKEN"))
+            print(f"共从Release导入 {count} 份简报")
+        elif args.command == "search":
+            articles = store.search(args.text, args.lang, args.start_date, args.end_date, args.limit)
+            for article in articles:
+                print(f"{article['date']}  {article['language']}  [{article['source']['name']}]  {article['title']}")
+            print(f"共 {len(articles)} 篇")
+        else:
+            articles = store.query(args.start_date, args.end_date, args.source, args.keyword,
+                                   args.lang, limit=args.limit)
+            for article in articles:
+                print(f"{article['date']}  [{article['source']['name']}]  {article['title']}")
+            print(f"共 {len(articles)} 篇")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
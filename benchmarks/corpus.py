@@ -0,0 +1,143 @@
+"""
+合成新闻语料生成器：按固定随机种子生成NewsAPI格式的文章，用于离线基准测试和本地模拟服务
+
+- 规模可配置（100到10万篇）
+- duplicate_rate 控制重复文章比例（完全相同或标题略有改动的转载）
+- keyword_density 控制标题和描述中出现热门关键词的概率
+
+使用方法: python benchmarks/corpus.py --size 1000 [--seed 42] [--duplicate-rate 0.2] [--keyword-density 0.5] [--out corpus.json]
+"""
+import argparse
+import json
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+
+# 与评分规则相关的来源：高可信、可信和普通来源各占一部分
+SOURCES = [
+    "Nature", "MIT Technology Review", "IEEE Spectrum", "arXiv",
+    "TechCrunch", "Wired", "The Verge", "Reuters", "Bloomberg", "BBC News", "VentureBeat", "ZDNet",
+    "Example Daily", "Tech Blog Weekly", "AI Insider", "Startup Journal", "Gadget World", "Local Herald"
+]
+
+FILLER_WORDS = (
+    "new report shows company launches update market growth users researchers team study data "
+    "platform tool release industry experts future plans investment funding startup global open "
+    "source public policy government court deal partnership product feature version test results "
+    "analysis performance cost energy hardware software cloud service customers developers early"
+).split()
+
+# 常用词之外的长尾词表：由音节拼成的伪词，按Zipf分布抽取，使词频接近真实标题
+_SYLLABLES = ["ka", "lo", "mi", "ran", "tes", "vor", "qui", "ben", "dal", "sur", "neo", "pix", "zen", "tra", "gol"]
+LONG_TAIL_SIZE = 5000
+
+DEFAULT_KEYWORDS = [
+    "openai", "chatgpt", "gpt-4", "llm", "large language model", "deepmind", "nvidia", "ai agent",
+    "machine learning", "deep learning", "generative ai", "robotics", "computer vision", "ai safety",
+    "transformer", "multimodal", "anthropic", "gemini", "llama", "stable diffusion"
+]
+
+
+def _vocabulary():
+    """常用词在前、长尾伪词在后的词表及其Zipf累积权重"""
+    words = list(FILLER_WORDS)
+    n = len(_SYLLABLES)
+    for i in range(LONG_TAIL_SIZE):
+        word = "".join(_SYLLABLES[(i // n ** k) % n] for k in range(3))
+        words.append(word + str(i // n ** 3) if i >= n ** 3 else word)
+    cum_weights = []
+    total = 0.0
+    for rank in range(1, len(words) + 1):
+        total += 1.0 / rank
+        cum_weights.append(total)
+    return words, cum_weights
+
+
+VOCABULARY, VOCABULARY_WEIGHTS = _vocabulary()
+
+
+def _sentence(rng, length, keywords, keyword_density):
+    words = rng.choices(VOCABULARY, cum_weights=VOCABULARY_WEIGHTS, k=length)
+    if keywords and rng.random() < keyword_density:
+        # 关键词出现在随机位置，偶尔出现在开头（影响标题位置加分）
+        for _ in range(rng.randint(1, 3)):
+            words.insert(rng.randint(0, len(words)), rng.choice(keywords))
+    return " ".join(words)
+
+
+def _variant(rng, title):
+    """转载时常见的标题改动：原样保留，或增删一个词"""
+    words = title.split()
+    roll = rng.random()
+    if roll < 0.4 or len(words) < 4:
+        return title
+    if roll < 0.7:
+        words.insert(rng.randint(0, len(words)), rng.choice(FILLER_WORDS))
+    else:
+        del words[rng.randrange(len(words))]
+    return " ".join(words)
+
+
+def generate_articles(size, seed=42, duplicate_rate=0.2, keyword_density=0.5, keywords=None, now=None):
+    """
+    生成NewsAPI格式的文章列表
+
+    Args:
+        size: 文章数
+        seed: 随机种子，相同参数（含now）生成相同语料
+        duplicate_rate: 作为之前某篇文章转载出现的比例
+        keyword_density: 标题和描述各自包含热门关键词的概率
+        keywords: 热门关键词列表，默认使用内置的常见AI关键词
+        now: 发布时间的参考时间（UTC），默认当前时间；文章分布在其前72小时内
+
+    Returns:
+        文章列表
+    """
+    rng = random.Random(seed)
+    keywords = [k.lower() for k in (keywords or DEFAULT_KEYWORDS)]
+    now = now or datetime.now(timezone.utc)
+    articles = []
+    for i in range(size):
+        published = now - timedelta(minutes=rng.randint(0, 72 * 60))
+        source = rng.choice(SOURCES)
+        if articles and rng.random() < duplicate_rate:
+            original = rng.choice(articles)
+            title = _variant(rng, original["title"])
+            description = original["description"]
+        else:
+            title = _sentence(rng, rng.randint(6, 14), keywords, keyword_density).capitalize()
+            description = _sentence(rng, rng.randint(15, 60), keywords, keyword_density).capitalize() + "."
+        articles.append({
+            "source": {"id": None, "name": source},
+            "author": f"Author {rng.randint(1, 500)}",
+            "title": title,
+            "description": description,
+            "url": f"https://news.example.com/{source.lower().replace(' ', '-')}/article/{i}",
+            "urlToImage": f"https://news.example.com/images/{i}.jpg" if rng.random() < 0.6 else None,
+            "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "content": description[:200]
+        })
+    return articles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成NewsAPI格式的合成新闻语料")
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--duplicate-rate", type=float, default=0.2)
+    parser.add_argument("--keyword-density", type=float, default=0.5)
+    parser.add_argument("--out", help="输出文件，默认输出到标准输出")
+    args = parser.parse_args()
+
+    articles = generate_articles(args.size, args.seed, args.duplicate_rate, args.keyword_density)
+    response = {"status": "ok", "totalResults": len(articles), "articles": articles}
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(response, f, ensure_ascii=False)
+        print(f"已生成 {len(articles)} 篇文章: {args.out}")
+    else:
+        json.dump(response, sys.stdout, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
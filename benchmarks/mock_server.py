@@ -0,0 +1,389 @@
+"""
+本地模拟服务：在一个端口上模拟NewsAPI、GNews、GitHub仓库搜索和智谱AI对话接口，
+用于在不联网、不消耗配额的情况下压测抓取和翻译流程的并发、限速和重试
+
+    GET  /v2/everything                  NewsAPI，支持page/pageSize、totalResults，超出免费额度返回426
+    GET  /api/v4/search                  GNews
+    GET  /search/repositories            GitHub仓库搜索，支持ETag和304
+    POST /api/paas/v4/chat/completions   智谱AI，单条和批量(JSON)翻译提示都会返回"译文"
+    GET  /__stats                        各接口的请求数、状态码分布和最大并发数
+    POST /__profile                      运行时替换延迟和错误配置（请求体为JSON配置）
+
+延迟和错误配置（--profile 指定JSON文件，键为 default/newsapi/gnews/github/zhipu）:
+    latency_ms       固定延迟
+    jitter_ms        在固定延迟上叠加的随机延迟上限
+    error_rate       以该概率返回 error_status
+    error_status     注入的错误状态码，默认500
+    fail_first       前N个请求直接返回 error_status
+    rate_limit_rps   每秒允许的请求数，超出时返回429并带Retry-After，0表示不限
+
+使用方法:
+    python benchmarks/mock_server.py [--port 8765] [--profile profile.json] [--total-results 500] [--seed 42]
+
+启动后按提示设置 NEWS_API_URL、GNEWS_API_URL、GITHUB_SEARCH_URL、ZHIPU_API_URL，
+并设置 HTTP_CACHE_DIR= 关闭响应缓存，即可对模拟服务运行 fetch_ai_news.py 和 translate.py
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import generate_articles  # noqa: E402
+
+ROUTES = {
+    ("GET", "/v2/everything"): "newsapi",
+    ("GET", "/api/v4/search"): "gnews",
+    ("GET", "/search/repositories"): "github",
+    ("POST", "/api/paas/v4/chat/completions"): "zhipu",
+}
+
+DEFAULT_PROFILE = {
+    "latency_ms": 0,
+    "jitter_ms": 0,
+    "error_rate": 0.0,
+    "error_status": 500,
+    "fail_first": 0,
+    "rate_limit_rps": 0,
+}
+
+# 模拟的免费账户最多可获取的NewsAPI结果数，超出时与真实接口一样返回426
+NEWSAPI_FREE_LIMIT = 100
+
+GITHUB_REPOS = [
+    ("transformers", "State-of-the-art machine learning for pytorch and tensorflow",
+     ["nlp", "deep-learning", "llm"]),
+    ("llama.cpp", "LLM inference in C/C++", ["llm", "inference", "ggml"]),
+    ("stable-diffusion-webui", "Stable Diffusion web UI", ["stable-diffusion", "ai-art"]),
+    ("langchain", "Build context-aware reasoning applications", ["llm", "agents", "rag"]),
+    ("vllm", "A high-throughput and memory-efficient inference engine for LLMs", ["llm", "inference"]),
+    ("autogen", "A programming framework for agentic AI", ["ai-agent", "multi-agent"]),
+]
+
+
+class RouteState:
+    """单个接口的配置和统计"""
+
+    def __init__(self, profile):
+        self.profile = dict(DEFAULT_PROFILE, **profile)
+        self.requests = 0
+        self.statuses = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.window_start = 0.0
+        self.window_count = 0
+
+
+class MockState:
+    """所有接口共享的状态，处理请求的线程通过锁访问"""
+
+    def __init__(self, profiles=None, total_results=500, seed=42):
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed)
+        self.total_results = total_results
+        self.articles = generate_articles(total_results, seed=seed)
+        self.routes = {}
+        self.set_profiles(profiles or {})
+
+    def set_profiles(self, profiles):
+        default = profiles.get("default", {})
+        with self.lock:
+            for name in set(ROUTES.values()):
+                state = self.routes.get(name) or RouteState({})
+                state.profile = dict(DEFAULT_PROFILE, **default, **profiles.get(name, {}))
+                self.routes[name] = state
+
+    def begin(self, name):
+        """
+        登记一个请求，决定注入的延迟和错误
+
+        Returns:
+            (延迟秒数, 注入的状态码或None, Retry-After秒数或None)
+        """
+        with self.lock:
+            state = self.routes[name]
+            profile = state.profile
+            state.requests += 1
+            state.in_flight += 1
+            state.max_in_flight = max(state.max_in_flight, state.in_flight)
+
+            delay = (profile["latency_ms"] + self.rng.uniform(0, profile["jitter_ms"])) / 1000
+
+            rps = profile["rate_limit_rps"]
+            if rps:
+                now = time.monotonic()
+                if now - state.window_start >= 1:
+                    state.window_start, state.window_count = now, 0
+                state.window_count += 1
+                if state.window_count > rps:
+                    return delay, 429, max(1, int(state.window_start + 1 - now + 0.999))
+
+            if state.requests <= profile["fail_first"] or self.rng.random() < profile["error_rate"]:
+                return delay, profile["error_status"], None
+            return delay, None, None
+
+    def end(self, name, status):
+        with self.lock:
+            state = self.routes[name]
+            state.in_flight -= 1
+            state.statuses[status] += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                name: {
+                    "requests": state.requests,
+                    "statuses": {str(k): v for k, v in sorted(state.statuses.items())},
+                    "max_in_flight": state.max_in_flight,
+                    "profile": state.profile,
+                }
+                for name, state in sorted(self.routes.items())
+            }
+
+
+def _int_param(query, name, default):
+    try:
+        return int(query.get(name, [default])[0])
+    except (TypeError, ValueError):
+        return default
+
+
+def newsapi_response(state, query):
+    if not query.get("apiKey"):
+        return 401, {"status": "error", "code": "apiKeyMissing", "message": "Your API key is missing."}
+    page = max(1, _int_param(query, "page", 1))
+    page_size = min(100, max(1, _int_param(query, "pageSize", 100)))
+    start = (page - 1) * page_size
+    if start >= NEWSAPI_FREE_LIMIT:
+        return 426, {"status": "error", "code": "maximumResultsReached",
+                     "message": f"Developer accounts are limited to a max of {NEWSAPI_FREE_LIMIT} results."}
+    return 200, {"status": "ok", "totalResults": state.total_results,
+                 "articles": state.articles[start:start + page_size]}
+
+
+def gnews_response(state, query):
+    if not query.get("apikey"):
+        return 401, {"errors": ["You did not provide an API key."]}
+    count = min(100, max(1, _int_param(query, "max", 10)))
+    articles = [
+        {
+            "title": a["title"],
+            "description": a["description"],
+            "content": a["content"],
+            "url": a["url"],
+            "image": a["urlToImage"],
+            "publishedAt": a["publishedAt"],
+            "source": {"name": a["source"]["name"], "url": "https://news.example.com"},
+        }
+        for a in state.articles[-count:]
+    ]
+    return 200, {"totalArticles": state.total_results, "articles": articles}
+
+
+def github_response(state, query):
+    per_page = min(100, max(1, _int_param(query, "per_page", 30)))
+    items = [{"name": name, "description": description, "topics": topics}
+             for name, description, topics in GITHUB_REPOS][:per_page]
+    return 200, {"total_count": len(GITHUB_REPOS), "incomplete_results": False, "items": items}
+
+
+def zhipu_response(state, body):
+    try:
+        prompt = body["messages"][-1]["content"]
+    except (KeyError, IndexError, TypeError):
+        return 400, {"error": {"code": "1214", "message": "messages参数非法"}}
+
+    # 批量翻译：提示语末尾是编号的JSON对象，按相同的键返回
+    match = re.search(r"(\{.*\})\s*$", prompt, re.S)
+    content = None
+    if match:
+        try:
+            segments = json.loads(match.group(1))
+            content = json.dumps({key: f"[译] {value}" for key, value in segments.items()}, ensure_ascii=False)
+        except ValueError:
+            pass
+    if content is None:
+        content = "[译] " + prompt.split("\n\n", 1)[-1]
+
+    return 200, {
+        "id": f"mock-{state.rng.randrange(1 << 30)}",
+        "model": body.get("model"),
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": len(prompt), "completion_tokens": len(content),
+                  "total_tokens": len(prompt) + len(content)},
+    }
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    server_version = "MockNewsServices/1.0"
+    protocol_version = "HTTP/1.1"  # 支持长连接，与真实接口一样复用连接池
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, data, headers=None):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _handle(self, method):
+        parsed = urlparse(self.path)
+        state = self.server.state
+        raw_body = self._read_body() if method == "POST" else b""
+
+        if method == "GET" and parsed.path == "/__stats":
+            return self._send_json(200, state.stats())
+        if method == "POST" and parsed.path == "/__profile":
+            try:
+                state.set_profiles(json.loads(raw_body or b"{}"))
+            except ValueError as e:
+                return self._send_json(400, {"error": str(e)})
+            return self._send_json(200, state.stats())
+
+        name = ROUTES.get((method, parsed.path))
+        if name is None:
+            return self._send_json(404, {"error": f"unknown endpoint {method} {parsed.path}"})
+
+        delay, error_status, retry_after = state.begin(name)
+        status = 500
+        try:
+            if delay:
+                time.sleep(delay)
+            if error_status is not None:
+                status = error_status
+                headers = {"Retry-After": str(retry_after)} if retry_after else None
+                return self._send_json(status, {"status": "error", "code": "injected",
+                                                "message": f"mock {name} error {status}"}, headers)
+
+            query = parse_qs(parsed.query)
+            if name == "newsapi":
+                status, data = newsapi_response(state, query)
+            elif name == "gnews":
+                status, data = gnews_response(state, query)
+            elif name == "github":
+                status, data = github_response(state, query)
+                etag = '"mock-github-v1"'
+                if self.headers.get("If-None-Match") == etag:
+                    status = 304
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                return self._send_json(status, data, {"ETag": etag})
+            else:
+                if not (self.headers.get("Authorization") or "").startswith("Bearer "):
+                    status, data = 401, {"error": {"code": "1000", "message": "身份验证失败"}}
+                else:
+                    try:
+                        status, data = zhipu_response(state, json.loads(raw_body or b"{}"))
+                    except ValueError:
+                        status, data = 400, {"error": {"code": "1214", "message": "请求体不是合法的JSON"}}
+            return self._send_json(status, data)
+        finally:
+            state.end(name, status)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+
+class MockServer:
+    """
+    在后台线程中运行的模拟服务，供压测脚本直接使用
+
+        with MockServer(profiles={"zhipu": {"rate_limit_rps": 2}}) as server:
+            os.environ.update(server.environ())
+            ...
+            print(server.state.stats())
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, profiles=None, total_results=500, seed=42, verbose=False):
+        self.state = MockState(profiles, total_results, seed)
+        self.httpd = ThreadingHTTPServer((host, port), MockHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = self.state
+        self.httpd.verbose = verbose
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def environ(self):
+        """把各接口地址指向本服务所需的环境变量"""
+        return {
+            "NEWS_API_URL": f"{self.base_url}/v2/everything",
+            "GNEWS_API_URL": f"{self.base_url}/api/v4/search",
+            "GITHUB_SEARCH_URL": f"{self.base_url}/search/repositories",
+            "ZHIPU_API_URL": f"{self.base_url}/api/paas/v4/chat/completions",
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NewsAPI/GNews/GitHub/智谱AI本地模拟服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--profile", help="延迟和错误配置JSON文件")
+    parser.add_argument("--total-results", type=int, default=500, help="NewsAPI报告的totalResults")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--verbose", action="store_true", help="打印每个请求")
+    args = parser.parse_args()
+
+    profiles = {}
+    if args.profile:
+        with open(args.profile, "r", encoding="utf-8") as f:
+            profiles = json.load(f)
+
+    server = MockServer(args.host, args.port, profiles, args.total_results, args.seed, args.verbose)
+    print(f"模拟服务已启动: {server.base_url}")
+    print("将抓取和翻译指向模拟服务:")
+    for key, value in server.environ().items():
+        print(f"  export {key}={value}")
+    print("  export HTTP_CACHE_DIR=")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
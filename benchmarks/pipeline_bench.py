@@ -0,0 +1,197 @@
+"""
+离线性能基准：在合成语料上测量抓取后各处理阶段的耗时和峰值内存，不访问任何外部API
+
+阶段:
+    keywords      HotKeywordsManager.update_from_news_titles
+    score         逐篇 calculate_article_score_with_dynamic_keywords
+    score_batch   score_articles 批量评分
+    similar_title 随机标题对的 similar_title
+    dedup_index   TitleDedupIndex 逐篇查重并收录
+    process       process_and_save_articles（校验、去重、评分、选取并写文件）
+    markdown      generate_markdown
+
+使用方法:
+    python benchmarks/pipeline_bench.py [--sizes 100 1000 10000] [--repeat 3] [--seed 42]
+        [--duplicate-rate 0.2] [--keyword-density 0.5] [--stages ...] [--no-memory]
+        [--json 结果.json] [--baseline 基线.json --tolerance 1.5]
+
+指定 --baseline 时，任一阶段耗时超过基线的 tolerance 倍则返回非零退出码
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# 基准在临时目录中运行，不读写仓库中的关键词缓存、去重指纹库和归档库，也不记录运行指标
+os.environ["DEDUP_STORE_PATH"] = ""
+os.environ["ARCHIVE_DB_PATH"] = ""
+os.environ["METRICS_FILE"] = ""
+os.environ.setdefault("TODAY", "2000-01-01")
+
+import fetch_ai_news  # noqa: E402
+import generate_pdf  # noqa: E402
+from corpus import generate_articles  # noqa: E402
+
+STAGES = ["keywords", "score", "score_batch", "similar_title", "dedup_index", "process", "markdown"]
+
+
+def _new_keywords_manager():
+    """临时目录中没有缓存文件，得到只含基础关键词的管理器"""
+    return fetch_ai_news.HotKeywordsManager()
+
+
+def _prepare(stage, articles, seed):
+    """
+    准备阶段的输入（不计入耗时），返回无参数的可调用对象
+
+    会修改文章的阶段使用深拷贝，每次运行互不影响
+    """
+    if stage == "keywords":
+        def run():
+            _new_keywords_manager().update_from_news_titles(articles)
+        return run
+
+    if stage in ("score", "score_batch"):
+        manager = _new_keywords_manager()
+        manager.update_from_news_titles(articles)
+        # 关键词自动机和NumPy的一次性开销不计入评分耗时
+        manager.get_keyword_matcher()
+        fetch_ai_news._load_numpy()
+        if stage == "score":
+            return lambda: [fetch_ai_news.calculate_article_score_with_dynamic_keywords(a, manager) for a in articles]
+        return lambda: fetch_ai_news.score_articles(articles, manager)
+
+    if stage == "similar_title":
+        rng = random.Random(seed)
+        titles = [(a["title"] or "").lower() for a in articles]
+        pairs = [(rng.choice(titles), rng.choice(titles)) for _ in range(len(titles))]
+        return lambda: [fetch_ai_news.similar_title(a, b) for a, b in pairs]
+
+    if stage == "dedup_index":
+        titles = [(a["title"] or "").lower().strip() for a in articles]
+
+        def run():
+            index = fetch_ai_news.TitleDedupIndex()
+            for title in titles:
+                if not index.find_similar(title):
+                    index.add(title)
+        return run
+
+    if stage == "process":
+        manager = _new_keywords_manager()
+        manager.update_from_news_titles(articles)
+        batch = copy.deepcopy(articles)
+        return lambda: fetch_ai_news.process_and_save_articles(batch, manager)
+
+    if stage == "markdown":
+        return lambda: generate_pdf.generate_markdown(articles, "bench_report.md", "en", "2000-01-01")
+
+    raise ValueError(f"未知阶段: {stage}")
+
+
+def measure(stage, articles, repeat, seed, with_memory):
+    """返回 (耗时中位数秒, 峰值内存字节或None)"""
+    timings = []
+    for _ in range(repeat):
+        run = _prepare(stage, articles, seed)
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+
+    peak = None
+    if with_memory:
+        run = _prepare(stage, articles, seed)
+        tracemalloc.start()
+        try:
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return statistics.median(timings), peak
+
+
+def _quiet(func, *args):
+    """屏蔽被测函数的打印输出"""
+    stdout = sys.stdout
+    with open(os.devnull, "w") as devnull:
+        sys.stdout = devnull
+        try:
+            return func(*args)
+        finally:
+            sys.stdout = stdout
+
+
+def check_baseline(results, baseline_path, tolerance):
+    """与基线比较，返回超出容差的 (规模, 阶段, 当前耗时, 基线耗时) 列表"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["size"], r["stage"]): r["seconds"] for r in json.load(f)["results"]}
+    regressions = []
+    for result in results:
+        base = baseline.get((result["size"], result["stage"]))
+        if base and result["seconds"] > base * tolerance:
+            regressions.append((result["size"], result["stage"], result["seconds"], base))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线处理阶段性能基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="语料规模")
+    parser.add_argument("--repeat", type=int, default=3, help="每个阶段计时的次数")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--duplicate-rate", type=float, default=0.2)
+    parser.add_argument("--keyword-density", type=float, default=0.5)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--no-memory", action="store_true", help="不测量峰值内存（tracemalloc会拖慢被测代码）")
+    parser.add_argument("--json", help="把结果写入JSON文件，可作为之后的基线")
+    parser.add_argument("--baseline", help="基线结果JSON文件")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="允许的耗时倍数")
+    args = parser.parse_args()
+
+    results = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        # 阶段抛出异常时也要先切回原目录，再清理临时目录
+        try:
+            print(f"{'规模':>8}  {'阶段':<14} {'耗时(ms)':>10} {'每篇(µs)':>10} {'峰值内存(MB)':>12}")
+            for size in args.sizes:
+                articles = generate_articles(size, args.seed, args.duplicate_rate, args.keyword_density,
+                                             keywords=fetch_ai_news.HOT_KEYWORDS)
+                for stage in args.stages:
+                    seconds, peak = _quiet(measure, stage, articles, args.repeat, args.seed, not args.no_memory)
+                    results.append({"size": size, "stage": stage, "seconds": seconds, "peak_bytes": peak})
+                    peak_text = f"{peak / 1e6:12.2f}" if peak is not None else f"{'-':>12}"
+                    print(f"{size:>8}  {stage:<14} {seconds * 1000:10.1f} {seconds / size * 1e6:10.1f} {peak_text}")
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        "params": {"seed": args.seed, "duplicate_rate": args.duplicate_rate,
+                   "keyword_density": args.keyword_density, "repeat": args.repeat},
+        "results": results
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"结果已保存到 {args.json}")
+
+    if args.baseline:
+        regressions = check_baseline(results, args.baseline, args.tolerance)
+        for size, stage, seconds, base in regressions:
+            print(f"FAIL {size} {stage}: {seconds * 1000:.1f}ms，基线 {base * 1000:.1f}ms")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+启动耗时基准：在全新的解释器中导入各入口脚本，测量导入耗时并检查是否提前加载了重量级依赖
+
+使用方法: python benchmarks/startup.py [--repeat N] [--budget-ms MS]
+
+任一模块的导入耗时中位数超过预算，或导入时加载了不应加载的依赖，返回非零退出码
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 入口模块及其导入时不应加载的重量级依赖
+STARTUP_TARGETS = {
+    "fetch_ai_news": ["requests", "urllib3"],
+    "generate_pdf": ["weasyprint", "jinja2"],
+    "http_client": ["requests", "urllib3"],
+}
+
+# 在子进程中执行：导入目标模块，输出耗时和已加载的受限模块
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import(module, forbidden, repeat):
+    """在repeat个全新解释器中导入module，返回 (耗时中位数秒, 提前加载的模块)"""
+    timings = []
+    loaded = set()
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, forbidden=forbidden)],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result["elapsed"])
+        loaded.update(result["loaded"])
+    return statistics.median(timings), sorted(loaded)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="入口脚本启动耗时基准")
+    parser.add_argument("--repeat", type=int, default=5, help="每个模块测量的次数")
+    parser.add_argument("--budget-ms", type=float, default=float(os.environ.get("STARTUP_BUDGET_MS", "250")),
+                        help="单个模块导入耗时中位数的上限（毫秒）")
+    args = parser.parse_args()
+
+    failed = False
+    for module, forbidden in STARTUP_TARGETS.items():
+        elapsed, loaded = measure_import(module, forbidden, args.repeat)
+        elapsed_ms = elapsed * 1000
+        status = "OK"
+        if loaded:
+            status = f"FAIL 提前加载了: {', '.join(loaded)}"
+            failed = True
+        elif elapsed_ms > args.budget_ms:
+            status = f"FAIL 超出预算 {args.budget_ms:.0f}ms"
+            failed = True
+        print(f"{module:<16} {elapsed_ms:8.1f} ms  {status}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
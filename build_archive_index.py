@@ -0,0 +1,192 @@
+"""
+生成网站归档页使用的静态数据：一个很小的清单文件和按月分片的简报摘要
+
+    <输出目录>/index.json     所有日期及其语言、文章数（按月分组）
+    <输出目录>/YYYY-MM.json   当月每天简报的标题、链接、来源和发布时间
+
+每个文件同时写出预压缩的 .gz（安装了brotli时还有 .br）版本。
+增量更新：只读取并重写新简报所在月份的分片和清单，不重新处理其他月份
+
+使用方法:
+    python build_archive_index.py [--out 目录] ai_news_YYYY-MM-DD.json ai_news_cn_YYYY-MM-DD.json
+    python build_archive_index.py [--out 目录] --rebuild    # 从归档库 news_archive.db 全量重建
+    python build_archive_index.py --backfill-releases [文件 ...]  # 清单尚未回填时，先从GitHub Release附件导入历史简报再重建
+
+清单中 complete 为 true 表示已包含所有历史Release；否则归档页会再通过Releases API补充清单中没有的日期
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+from datetime import datetime
+
+import archive_store
+
+ARCHIVE_SITE_DIR = os.environ.get("ARCHIVE_SITE_DIR", "archive_site")  # 静态归档数据目录，部署时复制到 _site/data/archive
+MANIFEST_FILE = "index.json"
+
+
+def _load_brotli():
+    """brotli为可选依赖，未安装时只生成gzip"""
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+
+def write_json(path, data):
+    """写出紧凑JSON及其预压缩版本，内容未变化时不重写"""
+    raw = json.dumps(data, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == raw:
+                return False
+    except OSError:
+        pass
+
+    variants = [(path, raw), (f"{path}.gz", gzip.compress(raw, compresslevel=9, mtime=0))]
+    brotli = _load_brotli()
+    if brotli is not None:
+        variants.append((f"{path}.br", brotli.compress(raw)))
+    for target, content in variants:
+        tmp_path = f"{target}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, target)
+    return True
+
+
+def read_json(path, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def summarize_articles(articles):
+    """分片中每篇文章只保留列表展示所需的字段"""
+    return [
+        {
+            "title": article.get("title"),
+            "url": article.get("url"),
+            "source": (article.get("source") or {}).get("name"),
+            "publishedAt": article.get("publishedAt")
+        }
+        for article in articles
+    ]
+
+
+class ArchiveIndexBuilder:
+    """按月分片的静态归档数据，修改过的分片和清单在save时写出"""
+
+    def __init__(self, out_dir, rebuild=False):
+        self.out_dir = out_dir
+        self.rebuild = rebuild  # 全量重建时忽略已有的清单和分片
+        os.makedirs(out_dir, exist_ok=True)
+        self.manifest = {"months": {}} if rebuild else read_json(os.path.join(out_dir, MANIFEST_FILE), {"months": {}})
+        self._shards = {}  # 月份 -> 分片内容，只加载用到的月份
+        self._dirty = set()
+        self._manifest_changed = False
+
+    def _shard(self, month):
+        if month not in self._shards:
+            self._shards[month] = {} if self.rebuild else read_json(os.path.join(self.out_dir, f"{month}.json"), {})
+        return self._shards[month]
+
+    def add_digest(self, date, language, data):
+        """加入（或替换）某天某种语言的简报"""
+        month = date[:7]
+        articles = data.get("articles") or []
+        self._shard(month).setdefault(date, {})[language] = summarize_articles(articles)
+        self.manifest["months"].setdefault(month, {}).setdefault(date, {})[language] = len(articles)
+        self._dirty.add(month)
+
+    def mark_complete(self):
+        """标记清单已包含所有历史Release"""
+        self.manifest["complete"] = True
+        self._manifest_changed = True
+
+    def save(self):
+        """写出修改过的分片和清单，返回写出的文件数"""
+        written = 0
+        for month in sorted(self._dirty):
+            written += write_json(os.path.join(self.out_dir, f"{month}.json"), self._shards[month])
+        if self._dirty or self._manifest_changed:
+            dates = [date for days in self.manifest["months"].values() for date in days]
+            if dates:
+                self.manifest["latest"] = max(dates)
+            self.manifest["updated"] = datetime.now().isoformat(timespec="seconds")
+            written += write_json(os.path.join(self.out_dir, MANIFEST_FILE), self.manifest)
+        self._dirty.clear()
+        self._manifest_changed = False
+        return written
+
+
+def backfill_from_releases(repo):
+    """把GitHub Release附件中的历史简报导入归档库，成功时返回True"""
+    if not archive_store.ARCHIVE_DB_PATH:
+        print("未配置归档库，跳过从Release回填")
+        return False
+    if not repo:
+        print("未指定仓库（--repo 或 GITHUB_REPOSITORY），跳过从Release回填")
+        return False
+    store = archive_store.ArchiveStore()
+    try:
+        count = archive_store.import_releases(store, repo, os.environ.get("GITHUB_TOKEN"))
+    except Exception as e:
+        print(f"从Release回填历史简报失败，归档页将继续通过Releases API补充: {e}")
+        return False
+    finally:
+        store.close()
+    print(f"从Release回填 {count} 份历史简报")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成网站归档页的静态清单和按月分片")
+    parser.add_argument("files", nargs="*", help="要加入的简报JSON文件")
+    parser.add_argument("--out", default=ARCHIVE_SITE_DIR, help="输出目录")
+    parser.add_argument("--rebuild", action="store_true", help="从归档库全量重建")
+    parser.add_argument("--backfill-releases", action="store_true",
+                        help="清单尚未包含历史Release时（首次部署或缓存丢失），先从Release附件导入再全量重建")
+    parser.add_argument("--repo", default=os.environ.get("GITHUB_REPOSITORY"), help="owner/name，默认GITHUB_REPOSITORY")
+    args = parser.parse_args()
+
+    if not args.files and not args.rebuild and not args.backfill_releases:
+        parser.print_usage()
+        sys.exit(1)
+
+    backfilled = False
+    if args.backfill_releases and not read_json(os.path.join(args.out, MANIFEST_FILE), {}).get("complete"):
+        backfilled = backfill_from_releases(args.repo)
+
+    builder = ArchiveIndexBuilder(args.out, rebuild=args.rebuild or backfilled)
+    if backfilled:
+        builder.mark_complete()
+
+    if args.rebuild or backfilled:
+        store = archive_store.ArchiveStore()
+        try:
+            for language in ("en", "zh"):
+                for date in store.list_dates(language):
+                    builder.add_digest(date, language, store.get_digest(date, language))
+        finally:
+            store.close()
+
+    for path in args.files:
+        digest = archive_store.digest_from_filename(path)
+        if digest is None or not os.path.isfile(path):
+            print(f"跳过无法识别或不存在的文件: {path}")
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            builder.add_digest(*digest, json.load(f))
+
+    written = builder.save()
+    print(f"归档索引已更新: {args.out}（写出 {written} 个文件）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import hashlib
+import sqlite3
+import time
+
+# 指纹类型
+KIND_URL = 0
+KIND_CONTENT = 1
+KIND_TITLE_WORD = 2
+
+# 与similar_title一致：标题词重合度超过该比例视为同一条新闻
+TITLE_SIMILARITY = 0.8
+
+
+def fingerprint(text):
+    """64位指纹（有符号整数，可直接存为SQLite INTEGER）"""
+    digest = hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def normalize_url(url):
+    """去掉锚点、首尾空白和末尾斜杠"""
+    return (url or "").split('#', 1)[0].strip().rstrip('/')
+
+
+class SQLiteDedupStore:
+    """
+    跨天去重指纹库（SQLite）
+
+    记录已发布文章的URL、内容指纹和标题词指纹，所有查询都走主键索引；
+    保存超过retention_days天的条目在打开时自动删除。
+    同一天内记录的条目不参与判重，重复运行当天的工作流不会把自己的结果过滤掉
+    """
+
+    def __init__(self, path, retention_days=7):
+        self.path = path
+        self.retention_days = retention_days
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS articles ("
+            "id INTEGER PRIMARY KEY, day TEXT NOT NULL, seen_at REAL NOT NULL, word_count INTEGER NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_seen_at ON articles(seen_at)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints ("
+            "kind INTEGER NOT NULL, hash INTEGER NOT NULL, article_id INTEGER NOT NULL, "
+            "PRIMARY KEY (kind, hash, article_id)) WITHOUT ROWID"
+        )
+        self.expire()
+
+    def expire(self, now=None):
+        """删除超过保留期的条目"""
+        cutoff = (now if now is not None else time.time()) - self.retention_days * 86400
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM fingerprints WHERE article_id IN (SELECT id FROM articles WHERE seen_at < ?)",
+                (cutoff,)
+            )
+            self.conn.execute("DELETE FROM articles WHERE seen_at < ?", (cutoff,))
+
+    def _has(self, kind, value, day):
+        row = self.conn.execute(
+            "SELECT 1 FROM fingerprints f JOIN articles a ON a.id = f.article_id "
+            "WHERE f.kind = ? AND f.hash = ? AND a.day != ? LIMIT 1",
+            (kind, fingerprint(value), day)
+        ).fetchone()
+        return row is not None
+
+    def is_duplicate(self, url, content_hash, title, day):
+        """
+        是否与之前某天发布过的文章重复
+
+        Args:
+            url: 文章链接
+            content_hash: 标题和描述组成的内容指纹
+            title: 小写标题
+            day: 当前输出日期，该日期记录的条目不参与判重
+        """
+        url = normalize_url(url)
+        if url and self._has(KIND_URL, url, day):
+            return True
+        if content_hash and self._has(KIND_CONTENT, content_hash, day):
+            return True
+
+        words = set(title.split())
+        if not words:
+            return False
+        hashes = [fingerprint(word) for word in words]
+        placeholders = ",".join("?" * len(hashes))
+        rows = self.conn.execute(
+            "SELECT a.word_count, COUNT(*) FROM fingerprints f JOIN articles a ON a.id = f.article_id "
+            f"WHERE f.kind = ? AND f.hash IN ({placeholders}) AND a.day != ? GROUP BY f.article_id",
+            [KIND_TITLE_WORD, *hashes, day]
+        ).fetchall()
+        return any(common / max(len(words), word_count) > TITLE_SIMILARITY for word_count, common in rows)
+
+    def add_many(self, items, day, seen_at=None):
+        """
+        记录已发布的文章
+
+        Args:
+            items: (url, content_hash, 小写标题) 可迭代对象
+            day: 输出日期
+            seen_at: 记录时间戳，默认当前时间
+        """
+        seen_at = seen_at if seen_at is not None else time.time()
+        with self.conn:
+            for url, content_hash, title in items:
+                words = set(title.split())
+                article_id = self.conn.execute(
+                    "INSERT INTO articles (day, seen_at, word_count) VALUES (?, ?, ?)",
+                    (day, seen_at, len(words))
+                ).lastrowid
+                rows = [(KIND_TITLE_WORD, fingerprint(word), article_id) for word in words]
+                url = normalize_url(url)
+                if url:
+                    rows.append((KIND_URL, fingerprint(url), article_id))
+                if content_hash:
+                    rows.append((KIND_CONTENT, fingerprint(content_hash), article_id))
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO fingerprints (kind, hash, article_id) VALUES (?, ?, ?)", rows
+                )
+
+    def close(self):
+        self.conn.close()
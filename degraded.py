@@ -0,0 +1,38 @@
+"""
+降级产出标记：阶段脚本用 mark_degraded() 报告本次产出是降级结果（示例数据、部分未翻译等）
+
+流水线（pipeline.py）通过环境变量把标记文件的路径传给阶段脚本，阶段结束后读取标记，
+降级产出照常交给下游使用，但不写入缓存。单独成模块，阶段脚本不需要导入流水线本身
+"""
+import os
+
+# 流水线通过该环境变量告诉阶段脚本降级标记文件的路径
+DEGRADED_MARKER_ENV = "PIPELINE_DEGRADED_MARKER"
+
+
+def mark_degraded(reason):
+    """
+    由阶段脚本调用：本次产出是降级结果，流水线照常交给下游使用，但不写入缓存，下次运行时重新执行
+
+    不在流水线中运行时只打印提示
+    """
+    print(f"警告: 产出为降级结果: {reason}")
+    path = os.environ.get(DEGRADED_MARKER_ENV)
+    if not path:
+        return
+    try:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(reason + "\n")
+    except OSError as e:
+        print(f"写入降级标记失败: {e}")
+
+
+def read_degraded_marker(path):
+    """读取并删除降级标记文件，返回记录的原因列表"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            reasons = [line.strip() for line in f if line.strip()]
+    except OSError:
+        return []
+    os.remove(path)
+    return reasons
@@ -1,25 +1,102 @@
-import requests
 import json
 import os
 from datetime import datetime, timedelta
 import re
 from collections import Counter
-from typing import Dict, List, Set
+from typing import Dict, List, Set, Tuple
 import logging
+import heapq
+import time
+import sqlite3
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from operator import itemgetter
+
+import archive_store
+import http_client
+import metrics
+from degraded import mark_degraded
+from keyword_store import SQLiteKeywordStore
+from dedup_store import SQLiteDedupStore
 
 # NewsAPI配置
-NEWS_API_URL = "https://newsapi.org/v2/everything"
+NEWS_API_URL = os.environ.get("NEWS_API_URL", "https://newsapi.org/v2/everything")
 API_KEY = os.environ.get("NEWS_API_KEY", "YOUR_NEWSAPI_KEY")  # 从环境变量获取API密钥
 QUERY = "(artificial intelligence OR machine learning OR deep learning OR AI OR LLM OR GPT)"  # 搜索关键词范围
 LANGUAGE = "en"  # 新闻语言
 SORT_BY = "relevancy"
 PAGE_SIZE = 100  # 减少到默认100篇文章，以避免超出免费计划限制
+NEWSAPI_MAX_PAGES = int(os.environ.get("NEWSAPI_MAX_PAGES", "1"))  # 最多请求的页数，免费计划只能获取第一页
+NEWSAPI_MAX_RESULTS = int(os.environ.get("NEWSAPI_MAX_RESULTS", "1000"))  # 单次运行最多获取的文章数（配额预算）
+NEWSAPI_PAGE_WORKERS = int(os.environ.get("NEWSAPI_PAGE_WORKERS", "4"))  # 并发请求的分页数
 sources = "bbc,techcrunch,arstechnica,engadget,techradar,thenextweb,wired,vice-news,google-news,news24,newsweek,abc-news,al-jazeera-english,associated-press,bloomberg,business-insider,cnn,fortune,fox-news,google-news-ca,google-news-uk,msnbc,nbc-news,new-scientist,reuters,the-verge,the-wall-street-journal,the-washington-post,time,the-new-york-times,the-wall-street-journal,usa-today,the-guardian-uk,the-times-of-india,the-washington-post,financial-times"  # 可靠新闻源
 
 # 备用新闻源API
-GNEWS_API_URL = "https://gnews.io/api/v4/search"
+GNEWS_API_URL = os.environ.get("GNEWS_API_URL", "https://gnews.io/api/v4/search")
 GNEWS_API_KEY = os.environ.get("GNEWS_API_KEY")
 
+# GitHub仓库搜索，用于提取趋势关键词
+GITHUB_SEARCH_URL = os.environ.get("GITHUB_SEARCH_URL", "https://api.github.com/search/repositories")
+
+# 请求配置
+REQUEST_TIMEOUT = float(os.environ.get("REQUEST_TIMEOUT", "15"))  # 单次HTTP请求超时（秒）
+CONCURRENT_FETCH = os.environ.get("CONCURRENT_FETCH", "1") != "0"  # 同时请求所有已配置的数据源，设为0则按顺序请求
+GITHUB_TRENDING_CACHE_TTL = int(os.environ.get("GITHUB_TRENDING_CACHE_TTL", str(12 * 3600)))  # GitHub趋势一天内变化很小，缓存更久
+
+# 输出文章数量
+TOP_K = int(os.environ.get("TOP_K", "20"))  # 保存评分最高的文章数
+MAX_ARTICLES_PER_SOURCE = int(os.environ.get("MAX_ARTICLES_PER_SOURCE", "0"))  # 同一来源最多入选的文章数，0表示不限制
+
+# 跨天去重
+DEDUP_STORE_PATH = os.environ.get("DEDUP_STORE_PATH", "seen_articles.db")  # 已发布文章指纹库，设为空字符串则只在单次运行内去重
+DEDUP_RETENTION_DAYS = float(os.environ.get("DEDUP_RETENTION_DAYS", "7"))  # 指纹保留天数
+
+# 动态关键词存储上限与衰减
+KEYWORD_HALF_LIFE_DAYS = float(os.environ.get("KEYWORD_HALF_LIFE_DAYS", "7"))  # 动态关键词权重的半衰期（天）
+KEYWORD_MAX_AGE_DAYS = float(os.environ.get("KEYWORD_MAX_AGE_DAYS", "30"))  # 超过该天数未再出现的关键词被淘汰
+KEYWORD_MIN_WEIGHT = float(os.environ.get("KEYWORD_MIN_WEIGHT", "0.00001"))  # 衰减后低于该权重的关键词被淘汰
+KEYWORD_MAX_ENTRIES = int(os.environ.get("KEYWORD_MAX_ENTRIES", "5000"))  # 动态关键词数量上限，超出时保留权重最高的
+KEYWORD_CACHE_BACKEND = os.environ.get("KEYWORD_CACHE_BACKEND", "sqlite")  # 关键词缓存格式：sqlite（增量写入）或json
+KEYWORD_CACHE_REBASE_DAYS = float(os.environ.get("KEYWORD_CACHE_REBASE_DAYS", "30"))  # 权重参考时间超过该天数时全量重写
+
+# 来源可靠度分级（内置列表），SOURCE_TIERS_FILE中的来源会追加到对应级别
+HIGHLY_TRUSTED_SOURCES = [
+    "nature", "science", "mit", "ieee", "arxiv",
+    "new york times", "nytimes", "wall street journal", "wsj",
+    "washington post", "financial times", "the economist",
+    "xinhua", "people's daily", "china daily"
+]
+
+TRUSTED_SOURCES = [
+    # 技术媒体
+    "techcrunch", "wired", "zdnet", "venturebeat", "verge", 
+    "artificial intelligence news", "mit technology review", "ai news",
+
+    # 主要国际媒体
+    "bbc", "guardian", "reuters", "associated press", "ap news", 
+    "bloomberg", "cnbc", "forbes", "usa today", "time magazine",
+    "the times", "telegraph", "economist", "cnn", "msnbc", "abc news",
+
+    # AI公司/研究机构
+    "huggingface", "deepmind", "openai", "google ai", "microsoft ai",
+
+    # 中国媒体
+    "xinhuanet", "chinadaily", "globaltimes", "cctv", "cgtn", 
+    "people's daily", "china news", "guangming daily", "economic daily",
+
+    # 日本媒体
+    "yomiuri shimbun", "asahi shimbun", "nihon keizai", "nikkei",
+
+    # 其他国际媒体
+    "lianhe zaobao", "chosun ilbo", "times of india", "jakarta post",
+    "der spiegel", "le monde", "el pais", "the sun", "south china morning post"
+]
+
+HIGHLY_TRUSTED_POINTS = 30
+TRUSTED_POINTS = 20
+SOURCE_TIERS_FILE = os.environ.get("SOURCE_TIERS_FILE", "source_tiers.json")  # 额外来源配置，格式 {"highly_trusted": [...], "trusted": [...]}
+
 # 热门AI关键词，用于评分和排序
 HOT_KEYWORDS = [
     # 大语言模型和聊天机器人
@@ -64,58 +141,278 @@ HOT_KEYWORDS = [
 ]
 
 
+def _build_c_automaton(keywords: List[str]):
+    """
+    安装了pyahocorasick时构建C实现的Aho-Corasick自动机；未安装或关键词为空时返回None
+
+    Returns:
+        (自动机, 词条列表)，自动机的值是词条编号，词条为 (关键词长度, 关键词下标列表)
+    """
+    try:
+        import ahocorasick
+    except ImportError:
+        return None
+    # 重复的关键词共用一个词条，值为全部下标
+    indices: Dict[str, List[int]] = {}
+    for index, keyword in enumerate(keywords):
+        if keyword:
+            indices.setdefault(keyword, []).append(index)
+    if not indices:
+        return None
+    automaton = ahocorasick.Automaton()
+    entries = []
+    for keyword, keyword_indices in indices.items():
+        automaton.add_word(keyword, len(entries))
+        entries.append((len(keyword), keyword_indices))
+    automaton.make_automaton()
+    return automaton, entries
+
+
+class KeywordMatcher:
+    """
+    多关键词匹配器
+
+    安装了pyahocorasick时使用C实现的Aho-Corasick自动机，一次扫描即可找出文本中出现的全部关键词；
+    未安装时逐个关键词做子串查找（与原来的 keyword in text 循环相同，纯Python自动机反而更慢）
+    """
+
+    def __init__(self, keywords: List[str]):
+        self.keywords = list(keywords)
+        self._empty = [i for i, k in enumerate(self.keywords) if not k]  # 空串在任意文本开头命中
+        self._automaton, self._entries = _build_c_automaton(self.keywords) or (None, [])
+        self._entry_arrays = None  # find_all_arrays使用的 (词条长度, 词条对应的关键词下标) 数组
+
+    def find_all(self, text: str) -> List[Tuple[int, int]]:
+        """
+        扫描文本，返回全部命中
+
+        Returns:
+            (起始位置, 关键词下标) 列表，重叠和重复出现的命中都会返回
+        """
+        matches = [(0, index) for index in self._empty]
+        if self._automaton is not None:
+            entries = self._entries
+            for end, entry in self._automaton.iter(text):
+                length, indices = entries[entry]
+                for index in indices:
+                    matches.append((end - length + 1, index))
+            return matches
+        for index, keyword in enumerate(self.keywords):
+            if not keyword:
+                continue
+            start = text.find(keyword)
+            while start != -1:
+                matches.append((start, index))
+                start = text.find(keyword, start + 1)
+        return matches
+
+    @property
+    def supports_batch(self) -> bool:
+        """
+        是否适合用find_all_arrays批量扫描拼接后的长文本：需要C实现自动机，
+        且没有空关键词（空串在每段文本开头都命中，拼接后无法还原）
+        """
+        return self._automaton is not None and not self._empty
+
+    def find_all_arrays(self, text: str):
+        """
+        find_all的NumPy版本，供批量评分扫描拼接后的长文本；
+        使用C实现自动机且没有重复关键词时直接从命中列表生成数组，不逐个命中执行Python代码
+
+        Returns:
+            (起始位置数组, 关键词下标数组)，命中顺序与find_all相同
+        """
+        np = _load_numpy()
+        if self._automaton is None or len(self._entries) != len(self.keywords):
+            matches = np.array(self.find_all(text), dtype=np.int64).reshape(-1, 2)
+            return matches[:, 0], matches[:, 1]
+        if self._entry_arrays is None:
+            self._entry_arrays = (np.array([length for length, _ in self._entries], dtype=np.int64),
+                                  np.array([indices[0] for _, indices in self._entries], dtype=np.int64))
+        lengths, entry_indices = self._entry_arrays
+        hits = list(self._automaton.iter(text))
+        ends = np.fromiter(map(itemgetter(0), hits), dtype=np.int64, count=len(hits))
+        entries = np.fromiter(map(itemgetter(1), hits), dtype=np.int64, count=len(hits))
+        return ends - lengths[entries] + 1, entry_indices[entries]
+
+    def first_positions(self, text: str) -> Dict[int, int]:
+        """返回每个命中关键词下标到其最早出现位置的映射"""
+        positions: Dict[int, int] = {}
+        if self._automaton is None:
+            for index, keyword in enumerate(self.keywords):
+                if keyword in text:
+                    positions[index] = text.find(keyword)
+            return positions
+        for start, index in self.find_all(text):
+            if index not in positions or start < positions[index]:
+                positions[index] = start
+        return positions
+
+    def contains_any(self, text: str) -> bool:
+        """文本中是否包含任意一个关键词"""
+        if self._empty:
+            return True
+        if self._automaton is not None:
+            for _ in self._automaton.iter(text):
+                return True
+            return False
+        for keyword in self.keywords:
+            if keyword in text:
+                return True
+        return False
+
+
+class KeywordSnapshot:
+    """某一版本关键词状态的只读快照：合并后的关键词集合、O(1)权重表及编译好的匹配器"""
+
+    def __init__(self, version: int, keywords: frozenset, weights: Dict[str, float]):
+        self.version = version
+        self.keywords = keywords
+        self.keyword_list = list(keywords)  # 固定顺序，保证评分累加顺序稳定
+        self.weights = weights
+        self._matcher = None
+
+    @property
+    def matcher(self) -> KeywordMatcher:
+        """首次使用时编译匹配器"""
+        if self._matcher is None:
+            self._matcher = KeywordMatcher(self.keyword_list)
+        return self._matcher
+
+
 class HotKeywordsManager:
     def __init__(self):
         self.base_keywords = HOT_KEYWORDS  # 基础关键词列表
         self.dynamic_keywords: Dict[str, float] = {}  # 动态关键词及其权重
         self.keyword_history: Dict[str, List[float]] = {}  # 关键词历史权重
-        self.cache_file = "hot_keywords_cache.json"
+        self.keyword_last_seen: Dict[str, float] = {}  # 关键词最近一次出现的时间戳
+        self.decayed_at = time.time()  # 权重最近一次衰减的时间戳
+        self.cache_file = "hot_keywords_cache.json"  # JSON格式缓存，也是迁移到SQLite的来源
+        self.store_file = "hot_keywords_cache.db"  # SQLite格式缓存
+        self._dirty_keywords: Set[str] = set()  # 上次保存后权重有变化的关键词
+        self._evicted_keywords: Set[str] = set()  # 上次保存后被淘汰的关键词
+        self._version = 0  # 关键词状态版本号，每次变更递增
+        self._snapshot = None  # 当前版本的关键词快照，状态变更时失效
         self.load_cached_keywords()
 
     def load_cached_keywords(self):
-        """从缓存文件加载历史关键词数据"""
+        """从缓存文件加载历史关键词数据，SQLite缓存不存在时从旧版JSON缓存迁移"""
         try:
-            if os.path.exists(self.cache_file):
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    cached_data = json.load(f)
-                    self.dynamic_keywords = cached_data.get('dynamic_keywords', {})
-                    self.keyword_history = cached_data.get('keyword_history', {})
+            if KEYWORD_CACHE_BACKEND == "sqlite":
+                store = SQLiteKeywordStore(self.store_file)
+                if store.exists():
+                    loaded = self._load_from_store(store)
+                elif os.path.exists(self.cache_file):
+                    loaded = self._load_from_json()
+                    if loaded:
+                        print(f"将关键词缓存从 {self.cache_file} 迁移到 {self.store_file}")
+                        self._save_to_store(store, full=True)
+                else:
+                    loaded = False
+            else:
+                loaded = os.path.exists(self.cache_file) and self._load_from_json()
+            
+            if loaded:
+                self._apply_decay()
+                self._prune_keywords()
+                self._invalidate_snapshot()
         except Exception as e:
             logging.error(f"加载关键词缓存失败: {e}")
 
+    def _load_from_json(self) -> bool:
+        """读取JSON格式的缓存"""
+        with open(self.cache_file, 'r', encoding='utf-8') as f:
+            cached_data = json.load(f)
+        self.dynamic_keywords = cached_data.get('dynamic_keywords', {})
+        self.keyword_history = cached_data.get('keyword_history', {})
+        self.keyword_last_seen = cached_data.get('keyword_last_seen', {})
+        
+        # 旧版缓存没有时间信息，以最后更新时间为准
+        try:
+            last_updated = datetime.fromisoformat(cached_data['last_updated']).timestamp()
+        except (KeyError, TypeError, ValueError):
+            last_updated = time.time()
+        self.decayed_at = cached_data.get('decayed_at', last_updated)
+        for word in self.dynamic_keywords:
+            self.keyword_last_seen.setdefault(word, last_updated)
+        return True
+
+    def _load_from_store(self, store: SQLiteKeywordStore) -> bool:
+        """读取SQLite格式的缓存，权重以存储的参考时间为基准"""
+        weights, history, last_seen, reference_time = store.load()
+        if reference_time is None:
+            return False
+        self.dynamic_keywords = weights
+        self.keyword_history = history
+        self.keyword_last_seen = last_seen
+        self.decayed_at = reference_time
+        return True
+
     def save_cached_keywords(self):
         """保存关键词数据到缓存文件"""
         try:
+            if KEYWORD_CACHE_BACKEND == "sqlite":
+                self._save_to_store(SQLiteKeywordStore(self.store_file))
+                return
             with open(self.cache_file, 'w', encoding='utf-8') as f:
                 json.dump({
                     'dynamic_keywords': self.dynamic_keywords,
                     'keyword_history': self.keyword_history,
+                    'keyword_last_seen': self.keyword_last_seen,
+                    'decayed_at': self.decayed_at,
                     'last_updated': datetime.now().isoformat()
                 }, f, ensure_ascii=False, indent=4)
         except Exception as e:
             logging.error(f"保存关键词缓存失败: {e}")
 
-    def update_from_github_trending(self):
-        """从GitHub Trending获取AI相关热门仓库信息"""
+    def _save_to_store(self, store: SQLiteKeywordStore, full: bool = False):
+        """
+        写入SQLite缓存
+        
+        衰减只改变内存中的权重，不改变存储；因此通常只需写入变化和淘汰的关键词，
+        并将其权重换算回存储的参考时间。参考时间过旧时全量重写
+        """
+        reference_time = None if full else store.reference_time()
+        now = time.time()
+        
+        if reference_time is None or self.decayed_at - reference_time > KEYWORD_CACHE_REBASE_DAYS * 86400:
+            rows = [(word, weight, self.keyword_last_seen.get(word, now), self.keyword_history.get(word, []))
+                    for word, weight in self.dynamic_keywords.items()]
+            store.save(rows, reference_time=self.decayed_at, replace_all=True, updated_at=now)
+        else:
+            factor = self._decay_factor(self.decayed_at - reference_time)
+            rows = [(word, self.dynamic_keywords[word] / factor, self.keyword_last_seen.get(word, now),
+                     self.keyword_history.get(word, []))
+                    for word in self._dirty_keywords if word in self.dynamic_keywords]
+            deleted = [word for word in self._evicted_keywords if word not in self.dynamic_keywords]
+            store.save(rows, deleted=deleted, updated_at=now)
+        
+        self._dirty_keywords.clear()
+        self._evicted_keywords.clear()
+
+    def fetch_github_trending_keywords(self) -> List[str]:
+        """从GitHub Trending获取AI相关热门仓库的关键词，不修改管理器状态，可在线程中调用"""
+        keywords = []
         try:
             headers = {'Accept': 'application/vnd.github.v3+json'}
             if 'GITHUB_TOKEN' in os.environ:
                 headers['Authorization'] = f"token {os.environ['GITHUB_TOKEN']}"
             
-            response = requests.get(
-                'https://api.github.com/search/repositories',
+            response = http_client.cached_get(
+                GITHUB_SEARCH_URL,
                 params={
                     'q': 'topic:artificial-intelligence',
                     'sort': 'stars',
                     'order': 'desc',
                     'per_page': 100
                 },
-                headers=headers
+                headers=headers,
+                timeout=REQUEST_TIMEOUT,
+                ttl=GITHUB_TRENDING_CACHE_TTL
             )
             
             if response.status_code == 200:
                 repos = response.json()['items']
-                keywords = []
                 for repo in repos:
                     # 提取仓库名称中的关键词
                     if repo.get('name'):
@@ -126,26 +423,36 @@ class HotKeywordsManager:
                     # 提取主题标签
                     keywords.extend(repo.get('topics', []))
                 
-                self._update_dynamic_keywords(keywords, source_weight=0.8)
-                
         except Exception as e:
             logging.error(f"从GitHub获取趋势失败: {e}")
+        
+        return keywords
+
+    def update_from_github_trending(self, keywords: List[str] = None):
+        """从GitHub Trending获取AI相关热门仓库信息，可传入已获取的关键词"""
+        if keywords is None:
+            keywords = self.fetch_github_trending_keywords()
+        if keywords:
+            self._update_dynamic_keywords(keywords, source_weight=0.8)
 
     def update_from_news_titles(self, articles: List[dict]):
         """从新闻标题中提取并更新热门词汇"""
-        keywords = []
-        for article in articles:
-            title = article.get('title', '') or ''
-            description = article.get('description', '') or ''
-            
-            # 提取词组和单词
-            title_words = self._extract_keywords(title.lower())
-            desc_words = self._extract_keywords(description.lower())
+        with metrics.span("fetch.keywords") as span:
+            keywords = []
+            for article in articles:
+                title = article.get('title', '') or ''
+                description = article.get('description', '') or ''
+                
+                # 提取词组和单词
+                title_words = self._extract_keywords(title.lower())
+                desc_words = self._extract_keywords(description.lower())
+                
+                keywords.extend(title_words)
+                keywords.extend(desc_words)
             
-            keywords.extend(title_words)
-            keywords.extend(desc_words)
-        
-        self._update_dynamic_keywords(keywords, source_weight=0.6)
+            self._update_dynamic_keywords(keywords, source_weight=0.6)
+            span.fields["articles"] = len(articles)
+            span.fields["keywords"] = len(keywords)
 
     def _extract_keywords(self, text: str) -> List[str]:
         """从文本中提取潜在的关键词"""
@@ -171,6 +478,10 @@ class HotKeywordsManager:
 
     def _update_dynamic_keywords(self, keywords: List[str], source_weight: float):
         """更新动态关键词权重"""
+        self._invalidate_snapshot()
+        self._apply_decay()
+        now = time.time()
+        
         # 计算词频
         counter = Counter(keywords)
         total_count = sum(counter.values())
@@ -196,117 +507,97 @@ class HotKeywordsManager:
             # 保留最近10个历史权重
             if len(self.keyword_history[word]) > 10:
                 self.keyword_history[word] = self.keyword_history[word][-10:]
+            
+            self.keyword_last_seen[word] = now
+            self._dirty_keywords.add(word)
+        
+        self._prune_keywords()
 
-    def get_current_hot_keywords(self) -> List[str]:
-        """获取当前热门关键词列表"""
-        # 合并基础关键词和动态关键词
-        all_keywords = set(self.base_keywords)
+    def _apply_decay(self, now: float = None):
+        """按距上次衰减经过的时间对动态关键词权重做指数衰减"""
+        if now is None:
+            now = time.time()
+        if now <= self.decayed_at or KEYWORD_HALF_LIFE_DAYS <= 0:
+            return
+        
+        factor = self._decay_factor(now - self.decayed_at)
+        for word in self.dynamic_keywords:
+            self.dynamic_keywords[word] *= factor
+        self.decayed_at = now
+
+    @staticmethod
+    def _decay_factor(elapsed_seconds: float) -> float:
+        """经过elapsed_seconds秒后权重的衰减系数"""
+        if KEYWORD_HALF_LIFE_DAYS <= 0:
+            return 1.0
+        return 0.5 ** (elapsed_seconds / 86400 / KEYWORD_HALF_LIFE_DAYS)
+
+    def _prune_keywords(self, now: float = None):
+        """淘汰权重过低或长期未出现的关键词，并将数量限制在KEYWORD_MAX_ENTRIES以内"""
+        if now is None:
+            now = time.time()
+        max_age = KEYWORD_MAX_AGE_DAYS * 86400
+        
+        evicted = [word for word, weight in self.dynamic_keywords.items()
+                   if weight < KEYWORD_MIN_WEIGHT or now - self.keyword_last_seen.get(word, now) > max_age]
+        
+        remaining = len(self.dynamic_keywords) - len(evicted)
+        if remaining > KEYWORD_MAX_ENTRIES:
+            evicted_set = set(evicted)
+            candidates = [(weight, word) for word, weight in self.dynamic_keywords.items() if word not in evicted_set]
+            keep = {word for _, word in heapq.nlargest(KEYWORD_MAX_ENTRIES, candidates)}
+            evicted.extend(word for _, word in candidates if word not in keep)
         
-        # 添加权重较高的动态关键词
-        dynamic_threshold = 0.1  # 权重阈值
-        trending_keywords = {k for k, v in self.dynamic_keywords.items() 
-                           if v > dynamic_threshold and k not in all_keywords}
+        self._evicted_keywords.update(evicted)
+        self._dirty_keywords.difference_update(evicted)
+        for word in evicted:
+            self.dynamic_keywords.pop(word, None)
+            self.keyword_history.pop(word, None)
+            self.keyword_last_seen.pop(word, None)
         
-        all_keywords.update(trending_keywords)
-        return list(all_keywords)
+        # 历史记录只保留仍在存储中的关键词
+        for word in [w for w in self.keyword_history if w not in self.dynamic_keywords]:
+            del self.keyword_history[word]
+        for word in [w for w in self.keyword_last_seen if w not in self.dynamic_keywords]:
+            del self.keyword_last_seen[word]
+
+    def _invalidate_snapshot(self):
+        """关键词状态已变化，丢弃旧快照"""
+        self._version += 1
+        self._snapshot = None
+
+    def get_keyword_snapshot(self) -> KeywordSnapshot:
+        """获取当前版本的关键词快照，仅在关键词状态变化后重建"""
+        if self._snapshot is None:
+            # 合并基础关键词和动态关键词
+            all_keywords = set(self.base_keywords)
+            weights = {k: 1.0 for k in all_keywords}
+            
+            # 添加权重较高的动态关键词
+            dynamic_threshold = 0.1  # 权重阈值
+            for k, v in self.dynamic_keywords.items():
+                if v > dynamic_threshold and k not in weights:
+                    all_keywords.add(k)
+                    weights[k] = v
+            
+            self._snapshot = KeywordSnapshot(self._version, frozenset(all_keywords), weights)
+        return self._snapshot
+
+    def get_current_hot_keywords(self) -> List[str]:
+        """获取当前热门关键词列表"""
+        return list(self.get_keyword_snapshot().keyword_list)
+
+    def get_keyword_matcher(self) -> KeywordMatcher:
+        """获取由当前热门关键词编译的匹配器，关键词未变化时复用"""
+        return self.get_keyword_snapshot().matcher
 
     def get_keyword_weight(self, keyword: str) -> float:
         """获取关键词的当前权重"""
-        if keyword in self.base_keywords:
-            return 1.0
+        weight = self.get_keyword_snapshot().weights.get(keyword)
+        if weight is not None:
+            return weight
         return self.dynamic_keywords.get(keyword, 0.0)
 
-def calculate_article_score(article):
-    """
-    计算文章的重要性评分，用于排序
-    
-    评分因素:
-    1. 标题或描述包含热门关键词
-    2. 来源可靠性
-    3. 内容新鲜度
-    4. 内容质量和长度
-    5. 关键词位置权重
-    """
-    score = 0
-    
-    title = (article.get("title") or "").lower()
-    description = (article.get("description") or "").lower()
-    
-    # 标题中的热门关键词（优先级更高）
-    for keyword in HOT_KEYWORDS:
-        if keyword in title:
-            # 关键词在标题开头得分更高
-            if title.startswith(keyword):
-                score += 8
-            else:
-                score += 6
-    
-    # 描述中的热门关键词
-    for keyword in HOT_KEYWORDS:
-        if keyword in description:
-            score += 3
-    
-    # 扩充可靠来源列表并按可靠度分级
-    highly_trusted_sources = ["nature", "science", "mit", "ieee", "arxiv"]
-    trusted_sources = [
-        "techcrunch", "wired", "bbc", "nytimes", "guardian", "reuters", 
-        "bloomberg", "cnbc", "forbes", "venturebeat", "verge", "zdnet", 
-        "huggingface", "deepmind", "openai", "google ai", "microsoft",
-        "artificial intelligence news", "mit technology review", "ai news",
-        "xinhuanet", "chinadaily", "globaltimes", "people's daily", "cctv", "cgtn"
-    ]
-    
-    source = article.get("source") or {}
-    source_name = (source.get("name") or "").lower()
-    
-    for source in highly_trusted_sources:
-        if source in source_name:
-            score += 30
-            break
-    for source in trusted_sources:
-        if source in source_name:
-            score += 20
-            break
-    
-    # 文章URL评分
-    url = (article.get("url") or "").lower()
-    if any(keyword in url for keyword in HOT_KEYWORDS):
-        score += 2
-    if "news" in url or "article" in url or "blog" in url:
-        score += 1
-    
-    # 内容质量评分
-    if article.get("urlToImage"):
-        score += 3
-    
-    # 去除HTML标签和多余空白
-    description = re.sub(r'<[^>]+>', '', description)
-    description = re.sub(r'\s+', ' ', description).strip()
-    
-    # 文章长度评分（优化范围）
-    desc_length = len(description)
-    if 200 <= desc_length <= 1000:
-        score += 8
-    elif 100 <= desc_length < 200:
-        score += 5
-    elif 50 <= desc_length < 100:
-        score += 2
-    
-    # 发布时间评分（更新的文章得分更高）
-    try:
-        pub_date = datetime.fromisoformat(article["publishedAt"].replace("Z", "+00:00"))
-        hours_ago = (datetime.now().astimezone() - pub_date.astimezone()).total_seconds() / 3600
-        if hours_ago <= 6:  # 6小时内
-            score += 10
-        elif hours_ago <= 12:  # 12小时内
-            score += 8
-        elif hours_ago <= 24:  # 24小时内
-            score += 5
-    except (ValueError, TypeError, KeyError):
-        pass
-    
-    return score
-
 def fetch_ai_news():
     """
     从NewsAPI获取人工智能相关新闻，并保存为JSON文件
@@ -333,33 +624,104 @@ def fetch_ai_news():
         print(f"查询范围: {from_date} 到 {to_date}")
         print(f"将保存到文件: {filename}")
         
-        # 更新GitHub趋势关键词
-        print("更新GitHub AI趋势关键词...")
-        keywords_manager.update_from_github_trending()
+        with metrics.span("fetch", concurrent=CONCURRENT_FETCH):
+            if CONCURRENT_FETCH:
+                print("并发请求GitHub趋势及所有已配置的新闻源...")
+                if not fetch_concurrently(from_date, to_date, keywords_manager):
+                    print("所有API请求均失败，将创建示例数据")
+                    create_sample_data(filename, keywords_manager)
+                return filename
+        
+            # 更新GitHub趋势关键词
+            print("更新GitHub AI趋势关键词...")
+            keywords_manager.update_from_github_trending()
         
-        # 先尝试使用NewsAPI
-        newsapi_success = fetch_from_newsapi(from_date, to_date, keywords_manager)
+            # 先尝试使用NewsAPI
+            newsapi_success = fetch_from_newsapi(from_date, to_date, keywords_manager)
         
-        # 如果NewsAPI失败，尝试使用备用API
-        if not newsapi_success and GNEWS_API_KEY:
-            print("NewsAPI请求失败，尝试使用GNews API作为备选...")
-            gnews_success = fetch_from_gnews(keywords_manager)
-            if not gnews_success:
-                print("所有API请求均失败，将创建示例数据")
+            # 如果NewsAPI失败，尝试使用备用API
+            if not newsapi_success and GNEWS_API_KEY:
+                print("NewsAPI请求失败，尝试使用GNews API作为备选...")
+                gnews_success = fetch_from_gnews(keywords_manager)
+                if not gnews_success:
+                    print("所有API请求均失败，将创建示例数据")
+                    create_sample_data(filename, keywords_manager)
+            elif not newsapi_success:
+                print("NewsAPI请求失败，且未配置备用API")
                 create_sample_data(filename, keywords_manager)
-        elif not newsapi_success:
-            print("NewsAPI请求失败，且未配置备用API")
-            create_sample_data(filename, keywords_manager)
             
-        return filename
+            return filename
     
     except Exception as e:
         print(f"获取新闻时发生意外错误: {e}")
         create_sample_data(filename, keywords_manager)
         return filename
 
-def fetch_from_newsapi(from_date, to_date, keywords_manager):
-    """从NewsAPI获取新闻"""
+def fetch_concurrently(from_date, to_date, keywords_manager):
+    """
+    并发请求GitHub趋势、NewsAPI及GNews，合并为一个候选文章池后统一处理
+    
+    总耗时取决于最慢的数据源，而不是各数据源耗时之和
+    
+    Returns:
+        是否获取到文章并保存成功
+    """
+    with metrics.span("fetch.sources") as span, ThreadPoolExecutor(max_workers=3) as executor:
+        github_future = executor.submit(keywords_manager.fetch_github_trending_keywords)
+        newsapi_future = executor.submit(request_newsapi_page, from_date, to_date)
+        gnews_future = executor.submit(request_gnews_articles) if GNEWS_API_KEY else None
+        
+        # 各数据源的异常互不影响，某个数据源出错时只跳过该数据源
+        newsapi_data = _source_result(newsapi_future, "NewsAPI")
+        articles = list((newsapi_data or {}).get("articles") or [])
+        if gnews_future is not None:
+            articles.extend(_source_result(gnews_future, "GNews") or [])
+        github_keywords = _source_result(github_future, "GitHub", default=[])
+        span.fields["articles"] = len(articles)
+    
+    # 关键词状态只在主线程中更新，顺序与顺序模式一致
+    keywords_manager.update_from_github_trending(github_keywords)
+    
+    if not articles:
+        return False
+    
+    print(f"合并后的候选文章: {len(articles)}篇")
+    
+    # 更新来自新闻的热门关键词
+    print("从新闻更新热门关键词...")
+    keywords_manager.update_from_news_titles(articles)
+    
+    # 保存更新后的关键词数据
+    keywords_manager.save_cached_keywords()
+    
+    # 处理首批文章，其余NewsAPI分页到达后逐页处理
+    processor = ArticleProcessor(keywords_manager)
+    processor.add_articles(articles)
+    if newsapi_data:
+        for page_articles in iter_newsapi_pages(from_date, to_date, newsapi_data.get("totalResults", 0)):
+            processor.add_articles(page_articles)
+    processor.save()
+    
+    return True
+
+def _source_result(future, source, default=None):
+    """取出数据源请求的结果；请求抛出异常时打印错误并返回default"""
+    try:
+        return future.result()
+    except Exception as e:
+        print(f"{source}请求发生意外错误，跳过该数据源: {e}")
+        metrics.incr("fetch.source_errors", source=source)
+        return default
+
+def request_newsapi_page(from_date, to_date, page=1):
+    """
+    请求NewsAPI的一页结果
+    
+    Returns:
+        NewsAPI返回的数据（包含articles和totalResults），请求失败时返回None
+    """
+    from requests.exceptions import RequestException
+    
     params = {
         "q": QUERY,
         "language": LANGUAGE,
@@ -370,47 +732,94 @@ def fetch_from_newsapi(from_date, to_date, keywords_manager):
         "to": to_date,
         "sources": sources
     }
+    if page > 1:
+        params["page"] = page
     
     try:
-        response = requests.get(NEWS_API_URL, params=params)
+        response = http_client.cached_get(NEWS_API_URL, params=params, timeout=REQUEST_TIMEOUT)
         
         # 检查特定的错误代码
         if response.status_code == 426:
             print("NewsAPI返回426错误：需要升级账户。这通常意味着当前API密钥是免费版本，存在使用限制。")
-            return False
+            return None
             
         response.raise_for_status()  # 处理其他HTTP错误
         
         news_data = response.json()
-        articles = news_data.get("articles", [])
-        total_results = news_data.get("totalResults", 0)
         
-        print(f"API返回总结果: {total_results}")
-        
-        if not articles:
-            print("NewsAPI未返回任何文章")
-            return False
+        if page == 1:
+            print(f"API返回总结果: {news_data.get('totalResults', 0)}")
+            if not news_data.get("articles"):
+                print("NewsAPI未返回任何文章")
+        else:
+            print(f"NewsAPI第{page}页返回: {len(news_data.get('articles') or [])}篇文章")
             
-        # 更新来自新闻的热门关键词
-        print("从新闻更新热门关键词...")
-        keywords_manager.update_from_news_titles(articles)
+        return news_data
         
-        # 保存更新后的关键词数据
-        keywords_manager.save_cached_keywords()
-        
-        # 处理并保存文章
-        process_and_save_articles(articles, keywords_manager)
-        
-        return True
-        
-    except requests.exceptions.RequestException as e:
-        print(f"NewsAPI请求失败: {e}")
+    except RequestException as e:
+        print(f"NewsAPI请求失败 (第{page}页): {e}")
+        return None
+
+def iter_newsapi_pages(from_date, to_date, total_results):
+    """
+    根据totalResults并发请求第2页及之后的分页，按页码顺序逐页产出文章列表
+    
+    同时在途的请求不超过NEWSAPI_PAGE_WORKERS个，已产出的分页不再保留，
+    页数受NEWSAPI_MAX_PAGES和NEWSAPI_MAX_RESULTS限制
+    """
+    result_budget = min(total_results or 0, NEWSAPI_MAX_RESULTS)
+    last_page = min(NEWSAPI_MAX_PAGES, -(-result_budget // PAGE_SIZE))
+    if last_page < 2:
+        return
+    
+    print(f"分页获取NewsAPI第2-{last_page}页...")
+    pages = iter(range(2, last_page + 1))
+    workers = max(1, NEWSAPI_PAGE_WORKERS)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque(executor.submit(request_newsapi_page, from_date, to_date, page)
+                        for page in islice(pages, workers))
+        while pending:
+            news_data = pending.popleft().result()
+            next_page = next(pages, None)
+            if next_page is not None:
+                pending.append(executor.submit(request_newsapi_page, from_date, to_date, next_page))
+            if news_data and news_data.get("articles"):
+                yield news_data["articles"]
+
+def fetch_from_newsapi(from_date, to_date, keywords_manager):
+    """从NewsAPI获取新闻，首页之后的分页在到达时逐页去重和评分"""
+    news_data = request_newsapi_page(from_date, to_date)
+    if not news_data or not news_data.get("articles"):
         return False
+    articles = news_data["articles"]
+        
+    # 更新来自新闻的热门关键词
+    print("从新闻更新热门关键词...")
+    keywords_manager.update_from_news_titles(articles)
+    
+    # 保存更新后的关键词数据
+    keywords_manager.save_cached_keywords()
+    
+    # 处理并保存文章
+    processor = ArticleProcessor(keywords_manager)
+    processor.add_articles(articles)
+    for page_articles in iter_newsapi_pages(from_date, to_date, news_data.get("totalResults", 0)):
+        processor.add_articles(page_articles)
+    processor.save()
+    
+    return True
 
-def fetch_from_gnews(keywords_manager):
-    """从GNews API获取新闻作为备用"""
+def request_gnews_articles():
+    """
+    请求GNews API，返回转换为NewsAPI格式的文章列表
+    
+    Returns:
+        文章列表，未配置密钥或请求失败时返回None
+    """
     if not GNEWS_API_KEY:
-        return False
+        return None
+    
+    from requests.exceptions import RequestException
         
     params = {
         "q": "artificial intelligence",
@@ -421,16 +830,13 @@ def fetch_from_gnews(keywords_manager):
     }
     
     try:
-        response = requests.get(GNEWS_API_URL, params=params)
+        response = http_client.cached_get(GNEWS_API_URL, params=params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         
         news_data = response.json()
         gnews_articles = news_data.get("articles", [])
         
         print(f"GNews API返回结果: {len(gnews_articles)}篇文章")
-        
-        if not gnews_articles:
-            return False
             
         # 转换为NewsAPI格式
         articles = []
@@ -445,32 +851,131 @@ def fetch_from_gnews(keywords_manager):
             }
             articles.append(article)
             
-        # 处理并保存文章
-        process_and_save_articles(articles, keywords_manager)
-        
-        return True
+        return articles
         
-    except requests.exceptions.RequestException as e:
+    except RequestException as e:
         print(f"GNews API请求失败: {e}")
-        return False
+        return None
 
-def process_and_save_articles(articles, keywords_manager):
-    """处理文章并保存到文件"""
-    # 获取文件名
-    output_date = os.environ.get('TODAY', datetime.now().strftime('%Y-%m-%d'))
-    filename = f"ai_news_{output_date}.json"
+def fetch_from_gnews(keywords_manager):
+    """从GNews API获取新闻作为备用"""
+    articles = request_gnews_articles()
+    if not articles:
+        return False
+        
+    # 处理并保存文章
+    process_and_save_articles(articles, keywords_manager)
     
-    # 文章去重和处理
-    seen_contents = set()
-    processed_articles = []
+    return True
+
+class TopKSelector:
+    """
+    流式选取评分最高的K个元素
+
+    用大小为K的最小堆保存当前入选的元素，内存O(K)，每个元素O(log K)。
+    评分相同时先加入的排在前面，与对全部元素做稳定排序后截取前K个的结果一致。
+    设置每个来源的上限时，结果等于先在每个来源内取前max_per_source个、再全局取前K个
+    """
+
+    def __init__(self, k: int, max_per_source: int = 0):
+        self.k = k
+        self.max_per_source = max_per_source  # 0表示不限制
+        self._heap = []  # (评分, -序号, 来源, 元素)，堆顶是当前最差的入选元素
+        self._by_source: Dict[str, list] = {}  # 来源 -> 该来源入选的堆条目，仅在限制来源时维护
+        self._counter = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, item, score, source=None) -> bool:
+        """加入一个元素，入选时返回True"""
+        entry = (score, -self._counter, source, item)
+        self._counter += 1
+        if self.k <= 0:
+            return False
+
+        if self.max_per_source > 0:
+            entries = self._by_source.setdefault(source, [])
+            if len(entries) >= self.max_per_source:
+                # 该来源已满：只有优于该来源最差的入选元素时才替换它
+                worst = min(entries)
+                if entry <= worst:
+                    return False
+                entries.remove(worst)
+                self._heap.remove(worst)
+                heapq.heapify(self._heap)
+                heapq.heappush(self._heap, entry)
+                entries.append(entry)
+                return True
+
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            evicted = heapq.heapreplace(self._heap, entry)
+            if self.max_per_source > 0:
+                self._by_source[evicted[2]].remove(evicted)
+        else:
+            return False
+        if self.max_per_source > 0:
+            self._by_source[source].append(entry)
+        return True
+
+    def result(self) -> list:
+        """按评分从高到低返回入选的元素"""
+        return [entry[3] for entry in sorted(self._heap, reverse=True)]
+
+
+class ArticleProcessor:
+    """
+    增量处理文章：字段校验、去重和评分，可以逐批（例如逐页）输入，最后统一排序保存
     
-    for article in articles:
+    评分使用创建时的关键词状态，因此应在更新热门关键词之后创建
+    """
+
+    def __init__(self, keywords_manager, top_k=None, max_per_source=None, history=None):
+        self.keywords_manager = keywords_manager
+        self.output_date = os.environ.get('TODAY', datetime.now().strftime('%Y-%m-%d'))
+        self.history = open_dedup_store() if history is None else history  # 跨天指纹库，False表示不使用
+        self.seen_contents = set()
+        self.title_index = TitleDedupIndex()
+        self.selector = TopKSelector(TOP_K if top_k is None else top_k,
+                                     MAX_ARTICLES_PER_SOURCE if max_per_source is None else max_per_source)
+        self.total_received = 0
+        self.total_accepted = 0
+        self.skipped_published = 0
+
+    def add_articles(self, articles) -> int:
+        """处理一批文章：逐篇校验和去重，再对接收的文章批量评分，返回本批被接收的文章数"""
+        with metrics.span("fetch.dedup") as span:
+            accepted = []
+            for article in articles:
+                self.total_received += 1
+                if self._accept(article):
+                    accepted.append(article)
+            span.fields["articles_in"] = len(articles)
+            span.fields["articles_out"] = len(accepted)
+        
+        # 使用更新后的关键词计算文章评分
+        with metrics.span("fetch.score") as span:
+            for article, score in zip(accepted, score_articles(accepted, self.keywords_manager)):
+                article["score"] = score
+                self.selector.push(article, score, article["source"]["name"].strip().lower())
+            span.fields["articles"] = len(accepted)
+        self.total_accepted += len(accepted)
+        return len(accepted)
+
+    def add_article(self, article) -> bool:
+        """处理单篇文章，被接收时返回True"""
+        return self.add_articles([article]) == 1
+
+    def _accept(self, article) -> bool:
+        """校验、去重并规范化单篇文章，被接收时返回True"""
         # 先确保所有必要字段都存在且不为None
         if not all(key in article and article[key] is not None for key in ["title", "description", "url", "publishedAt"]):
-            continue
+            return False
             
         if not article["description"] or article["description"].strip() == "":
-            continue
+            return False
         
         # 确保source字段及其子字段存在
         if "source" not in article or not isinstance(article["source"], dict):
@@ -479,26 +984,23 @@ def process_and_save_articles(articles, keywords_manager):
             article["source"]["name"] = "Unknown Source"
         
         # 生成文章内容的指纹
-        title = (article["title"] or "").lower().strip()
-        desc = (article["description"] or "").lower().strip()
-        content_hash = f"{title[:50]}_{desc[:100]}"
+        title, content_hash = self._fingerprint(article)
         
         # 检查是否有相似内容
-        if content_hash in seen_contents:
-            continue
+        if content_hash in self.seen_contents:
+            return False
         
         # 检查标题相似度
-        similar_found = False
-        for processed_article in processed_articles:
-            proc_title = (processed_article.get("title") or "").lower().strip()
-            if proc_title and similar_title(title, proc_title):
-                similar_found = True
-                break
+        if self.title_index.find_similar(title):
+            return False
         
-        if similar_found:
-            continue
+        # 检查之前几天是否已发布过
+        if self.history and self.history.is_duplicate(article["url"], content_hash, title, self.output_date):
+            self.skipped_published += 1
+            return False
         
-        seen_contents.add(content_hash)
+        self.seen_contents.add(content_hash)
+        self.title_index.add(title)
         
         try:
             pub_date = datetime.fromisoformat(article["publishedAt"].replace("Z", "+00:00"))
@@ -506,32 +1008,81 @@ def process_and_save_articles(articles, keywords_manager):
         except (ValueError, TypeError, AttributeError):
             article["publishedAt"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        # 使用更新后的关键词计算文章评分
-        article["score"] = calculate_article_score_with_dynamic_keywords(article, keywords_manager)
-        processed_articles.append(article)
-    
-    # 按评分排序并选取前20篇
-    processed_articles.sort(key=lambda x: x.get("score", 0), reverse=True)
-    top_articles = processed_articles[:20] if processed_articles else []
-    
-    # 保存文章时也保存当前的热门关键词
-    output_data = {
-        "articles": top_articles,
-        "hot_keywords": {
-            "timestamp": datetime.now().isoformat(),
-            "keywords": keywords_manager.get_current_hot_keywords(),
-            "dynamic_weights": keywords_manager.dynamic_keywords
+        return True
+
+    @staticmethod
+    def _fingerprint(article) -> Tuple[str, str]:
+        """返回 (小写标题, 内容指纹)"""
+        title = (article["title"] or "").lower().strip()
+        desc = (article["description"] or "").lower().strip()
+        return title, f"{title[:50]}_{desc[:100]}"
+
+    def save(self, filename=None):
+        """按评分从高到低保存入选的文章，并记入跨天指纹库"""
+        # 获取文件名
+        if filename is None:
+            filename = f"ai_news_{self.output_date}.json"
+        
+        keywords_manager = self.keywords_manager
+        top_articles = self.selector.result()
+        metrics.incr("fetch.articles_received", self.total_received)
+        metrics.incr("fetch.articles_accepted", self.total_accepted)
+        metrics.incr("fetch.articles_selected", len(top_articles))
+        metrics.incr("fetch.articles_skipped_published", self.skipped_published)
+        
+        # 保存文章时也保存当前的热门关键词
+        output_data = {
+            "articles": top_articles,
+            "hot_keywords": {
+                "timestamp": datetime.now().isoformat(),
+                "keywords": keywords_manager.get_current_hot_keywords(),
+                "dynamic_weights": keywords_manager.dynamic_keywords
+            }
         }
-    }
-    
-    with open(filename, "w", encoding="utf-8") as file:
-        json.dump(output_data, file, indent=4, ensure_ascii=False)
-    
-    print(f"成功筛选和排序 {len(top_articles)} 篇高质量AI新闻文章 (共获取: {len(processed_articles)})，并保存到 {filename}")
-    print(f"当前热门关键词数量: {len(keywords_manager.get_current_hot_keywords())}")
+        
+        with metrics.span("fetch.save"):
+            with open(filename, "w", encoding="utf-8") as file:
+                json.dump(output_data, file, indent=4, ensure_ascii=False)
+            archive_store.append_digest(self.output_date, "en", output_data)
+        
+        print(f"成功筛选和排序 {len(top_articles)} 篇高质量AI新闻文章 (共获取: {self.total_accepted})，并保存到 {filename}")
+        
+        if self.history:
+            if self.skipped_published:
+                print(f"跳过之前几天已发布的文章 {self.skipped_published} 篇")
+            records = []
+            for article in top_articles:
+                title, content_hash = self._fingerprint(article)
+                records.append((article["url"], content_hash, title))
+            try:
+                self.history.add_many(records, self.output_date)
+            except sqlite3.Error as e:
+                logging.error(f"写入去重指纹库失败: {e}")
+            finally:
+                self.history.close()
+        print(f"当前热门关键词数量: {len(keywords_manager.get_current_hot_keywords())}")
+        return filename
+
+def open_dedup_store():
+    """打开跨天去重指纹库，未配置或无法打开时返回False"""
+    if not DEDUP_STORE_PATH:
+        return False
+    try:
+        return SQLiteDedupStore(DEDUP_STORE_PATH, DEDUP_RETENTION_DAYS)
+    except sqlite3.Error as e:
+        logging.error(f"打开去重指纹库失败，只在本次运行内去重: {e}")
+        return False
+
+def process_and_save_articles(articles, keywords_manager):
+    """处理文章并保存到文件"""
+    processor = ArticleProcessor(keywords_manager)
+    processor.add_articles(articles)
+    processor.save()
 
 def create_sample_data(filename, keywords_manager):
     """创建示例新闻数据，当所有API都失败时使用"""
+    metrics.incr("fetch.sample_data")
+    mark_degraded("所有新闻API请求失败，使用示例数据")
     print("创建示例新闻数据...")
     
     sample_articles = [
@@ -579,6 +1130,83 @@ def create_sample_data(filename, keywords_manager):
     
     print(f"已创建示例数据并保存到 {filename}")
 
+class SourceReputationIndex:
+    """
+    来源可靠度索引
+
+    所有级别的来源名放进同一个KeywordMatcher，一次匹配即可得到来源名命中的级别；
+    结果按小写来源名缓存，每次运行出现的来源只有几十个，绝大多数查询直接命中缓存
+    """
+
+    def __init__(self, highly_trusted: List[str], trusted: List[str]):
+        self.highly_trusted = list(dict.fromkeys(s.lower() for s in highly_trusted))
+        self.trusted = list(dict.fromkeys(s.lower() for s in trusted))
+        patterns = self.highly_trusted + self.trusted
+        # 同一来源可能同时出现在两个级别，各自独立计分
+        self._tiers = [True] * len(self.highly_trusted) + [False] * len(self.trusted)
+        self._matcher = KeywordMatcher(patterns)
+        self._cache: Dict[str, Tuple[int, int]] = {}
+
+    def tier_points(self, source_name: str) -> Tuple[int, int]:
+        """
+        来源可靠度得分
+
+        Args:
+            source_name: 来源名（小写）
+
+        Returns:
+            (高可信来源得分, 可信来源得分)，两者独立判断
+        """
+        points = self._cache.get(source_name)
+        if points is None:
+            highly_trusted = trusted = False
+            for _, index in self._matcher.find_all(source_name):
+                if self._tiers[index]:
+                    highly_trusted = True
+                else:
+                    trusted = True
+            points = (HIGHLY_TRUSTED_POINTS if highly_trusted else 0, TRUSTED_POINTS if trusted else 0)
+            self._cache[source_name] = points
+        return points
+
+def load_source_tiers(path=None) -> Tuple[List[str], List[str]]:
+    """
+    读取来源分级配置，配置中的来源追加到内置列表之后
+
+    Returns:
+        (高可信来源列表, 可信来源列表)
+    """
+    path = path or SOURCE_TIERS_FILE
+    highly_trusted = list(HIGHLY_TRUSTED_SOURCES)
+    trusted = list(TRUSTED_SOURCES)
+    if path and os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            highly_trusted.extend(s for s in config.get("highly_trusted", []) if isinstance(s, str))
+            trusted.extend(s for s in config.get("trusted", []) if isinstance(s, str))
+        except (OSError, ValueError, AttributeError) as e:
+            logging.error(f"读取来源分级配置失败: {e}")
+    return highly_trusted, trusted
+
+_source_index = None
+
+def get_source_index() -> SourceReputationIndex:
+    """获取来源可靠度索引，首次使用时加载配置并编译"""
+    global _source_index
+    if _source_index is None:
+        _source_index = SourceReputationIndex(*load_source_tiers())
+    return _source_index
+
+def source_tier_points(source_name):
+    """
+    来源可靠度得分
+    
+    Returns:
+        (高可信来源得分, 可信来源得分)，两者独立判断
+    """
+    return get_source_index().tier_points(source_name)
+
 def calculate_article_score_with_dynamic_keywords(article, keywords_manager):
     """使用动态关键词计算文章评分"""
     score = 0
@@ -587,72 +1215,36 @@ def calculate_article_score_with_dynamic_keywords(article, keywords_manager):
     title = (article.get("title") or "").lower()
     description = (article.get("description") or "").lower()
     
-    # 获取当前热门关键词及其权重
-    current_keywords = keywords_manager.get_current_hot_keywords()
+    # 获取当前关键词快照及其编译好的匹配器
+    snapshot = keywords_manager.get_keyword_snapshot()
+    matcher = snapshot.matcher
+    current_keywords = snapshot.keyword_list
+    weights = snapshot.weights
     
-    # 标题关键词评分
-    for keyword in current_keywords:
-        if keyword in title:
-            weight = keywords_manager.get_keyword_weight(keyword)
-            if title.startswith(keyword):
-                score += 8 * weight
-            else:
-                score += 6 * weight
+    # 标题关键词评分（按关键词顺序累加，保证结果与逐个匹配一致）
+    title_hits = matcher.first_positions(title)
+    for index in sorted(title_hits):
+        weight = weights[current_keywords[index]]
+        if title_hits[index] == 0:
+            score += 8 * weight
+        else:
+            score += 6 * weight
     
     # 描述关键词评分
-    for keyword in current_keywords:
-        if keyword in description:
-            weight = keywords_manager.get_keyword_weight(keyword)
-            score += 3 * weight
+    for index in sorted(matcher.first_positions(description)):
+        weight = weights[current_keywords[index]]
+        score += 3 * weight
     
     # 来源可靠度评分
-    highly_trusted_sources = [
-        "nature", "science", "mit", "ieee", "arxiv",
-        "new york times", "nytimes", "wall street journal", "wsj",
-        "washington post", "financial times", "the economist",
-        "xinhua", "people's daily", "china daily"
-    ]
-    
-    trusted_sources = [
-        # 技术媒体
-        "techcrunch", "wired", "zdnet", "venturebeat", "verge", 
-        "artificial intelligence news", "mit technology review", "ai news",
-        
-        # 主要国际媒体
-        "bbc", "guardian", "reuters", "associated press", "ap news", 
-        "bloomberg", "cnbc", "forbes", "usa today", "time magazine",
-        "the times", "telegraph", "economist", "cnn", "msnbc", "abc news",
-        
-        # AI公司/研究机构
-        "huggingface", "deepmind", "openai", "google ai", "microsoft ai",
-        
-        # 中国媒体
-        "xinhuanet", "chinadaily", "globaltimes", "cctv", "cgtn", 
-        "people's daily", "china news", "guangming daily", "economic daily",
-        
-        # 日本媒体
-        "yomiuri shimbun", "asahi shimbun", "nihon keizai", "nikkei",
-        
-        # 其他国际媒体
-        "lianhe zaobao", "chosun ilbo", "times of india", "jakarta post",
-        "der spiegel", "le monde", "el pais", "the sun", "south china morning post"
-    ]
-    
     source = article.get("source") or {}
     source_name = (source.get("name") or "").lower()
-    
-    for source in highly_trusted_sources:
-        if source in source_name:
-            score += 30
-            break
-    for source in trusted_sources:
-        if source in source_name:
-            score += 20
-            break
+    highly_trusted_points, trusted_points = source_tier_points(source_name)
+    score += highly_trusted_points
+    score += trusted_points
     
     # URL评分
     url = (article.get("url") or "").lower()
-    if any(keyword in url for keyword in current_keywords):
+    if matcher.contains_any(url):
         score += 2
     if "news" in url or "article" in url or "blog" in url:
         score += 1
@@ -688,6 +1280,133 @@ def calculate_article_score_with_dynamic_keywords(article, keywords_manager):
     
     return score
 
+def _load_numpy():
+    """按需导入NumPy，未安装时返回None"""
+    try:
+        import numpy
+        return numpy
+    except ImportError:
+        return None
+
+def _published_timestamp(article):
+    """解析发布时间为时间戳，无法解析时返回NaN"""
+    try:
+        pub_date = datetime.fromisoformat(article["publishedAt"].replace("Z", "+00:00"))
+        return pub_date.astimezone().timestamp()
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return float("nan")
+
+_SEGMENT_SEPARATOR = "\x00"  # 批量匹配时拼接文本用的分隔符，关键词中不会出现，命中不会跨越两段文本
+
+def score_articles(articles, keywords_manager):
+    """
+    批量计算文章评分，结果与逐篇调用calculate_article_score_with_dynamic_keywords相同
+    
+    全部文章的标题、描述和URL转为小写后用分隔符拼接成一个字符串，C实现自动机只扫描一次，
+    命中位置按各段的起始偏移映射回文章；去重、取最早位置和排序都用NumPy完成。
+    关键词命中以稀疏矩阵表示，与关键词权重相乘后按命中顺序逐列累加，
+    各项得分的累加顺序与逐篇评分一致，保证浮点结果完全相同。未安装NumPy或pyahocorasick时逐篇评分
+    
+    Returns:
+        与输入顺序一致的评分列表
+    """
+    np = _load_numpy()
+    if np is None or not articles:
+        return [calculate_article_score_with_dynamic_keywords(article, keywords_manager) for article in articles]
+    
+    snapshot = keywords_manager.get_keyword_snapshot()
+    matcher = snapshot.matcher
+    if not matcher.supports_batch or any(_SEGMENT_SEPARATOR in keyword for keyword in snapshot.keyword_list):
+        # 纯Python自动机扫描长文本并不比逐篇快，逐篇评分
+        return [calculate_article_score_with_dynamic_keywords(article, keywords_manager) for article in articles]
+    keyword_count = max(len(snapshot.keyword_list), 1)
+    keyword_weights = np.array([snapshot.weights[k] for k in snapshot.keyword_list] or [0.0])
+    
+    count = len(articles)
+    segments = []  # 每篇文章依次为标题、描述、URL
+    trusted_points = {}
+    highly_trusted = np.empty(count)
+    trusted = np.empty(count)
+    url_news = np.zeros(count, dtype=bool)
+    has_image = np.zeros(count, dtype=bool)
+    desc_lengths = np.empty(count, dtype=np.int64)
+    published = np.empty(count)
+    
+    for i, article in enumerate(articles):
+        description = (article.get("description") or "").lower()
+        url = (article.get("url") or "").lower()
+        segments.append((article.get("title") or "").lower())
+        segments.append(description)
+        segments.append(url)
+        
+        source_name = ((article.get("source") or {}).get("name") or "").lower()
+        points = trusted_points.get(source_name)
+        if points is None:
+            points = trusted_points[source_name] = source_tier_points(source_name)
+        highly_trusted[i], trusted[i] = points
+        
+        url_news[i] = "news" in url or "article" in url or "blog" in url
+        has_image[i] = bool(article.get("urlToImage"))
+        
+        # 去掉HTML标签后按空白切分，与re.sub(r'\s+', ' ', ...).strip()的长度相同
+        if "<" in description:
+            description = re.sub(r'<[^>]+>', '', description)
+        words = description.split()
+        desc_lengths[i] = sum(map(len, words)) + len(words) - 1 if words else 0
+        published[i] = _published_timestamp(article)
+    
+    # 一次扫描全部文本，按起始偏移把命中映射回段落
+    segment_starts = np.zeros(len(segments), dtype=np.int64)
+    np.cumsum(np.fromiter(map(len, segments), dtype=np.int64, count=len(segments))[:-1] + 1,
+              out=segment_starts[1:])
+    starts, keywords = matcher.find_all_arrays(_SEGMENT_SEPARATOR.join(segments))
+    segment = np.searchsorted(segment_starts, starts, side="right") - 1
+    article_index, kind = np.divmod(segment, 3)
+    
+    # URL中包含任意关键词
+    url_keyword = np.zeros(count, dtype=bool)
+    url_keyword[article_index[kind == 2]] = True
+    
+    # 标题和描述中每个关键词只取最早的一次命中，按 (文章, 标题在前描述在后, 关键词下标) 排序
+    text = kind < 2
+    keys = segment[text] * keyword_count + keywords[text]
+    order = np.lexsort((starts[text], keys))
+    keys = keys[order]
+    first = np.ones(len(keys), dtype=bool)
+    first[1:] = keys[1:] != keys[:-1]
+    hit_keys = keys[first]
+    hit_starts = starts[text][order][first]
+    hit_segments, hit_keywords = np.divmod(hit_keys, keyword_count)
+    hit_articles, hit_kinds = np.divmod(hit_segments, 3)
+    # 标题开头8、标题其他位置6、描述3
+    hit_coefficients = np.where(hit_kinds == 1, 3, np.where(hit_starts == segment_starts[hit_segments], 8, 6))
+    hit_indptr = np.searchsorted(hit_articles, np.arange(count + 1))
+    
+    # 关键词得分：命中值 = 系数 × 权重，每行按命中顺序逐列累加
+    hit_values = hit_coefficients.astype(float) * keyword_weights[hit_keywords]
+    hit_counts = np.diff(hit_indptr)
+    scores = np.zeros(count)
+    for column in range(int(hit_counts.max())):
+        rows = np.nonzero(hit_counts > column)[0]
+        scores[rows] += hit_values[hit_indptr[rows] + column]
+    
+    # 其余各项按逐篇评分的顺序累加
+    scores += highly_trusted
+    scores += trusted
+    scores += np.where(url_keyword, 2, 0)
+    scores += np.where(url_news, 1, 0)
+    scores += np.where(has_image, 3, 0)
+    scores += np.select(
+        [(desc_lengths >= 200) & (desc_lengths <= 1000), (desc_lengths >= 100) & (desc_lengths < 200),
+         (desc_lengths >= 50) & (desc_lengths < 100)],
+        [8, 5, 2], 0)
+    hours_ago = (datetime.now().astimezone().timestamp() - published) / 3600
+    with np.errstate(invalid="ignore"):
+        scores += np.select([hours_ago <= 6, hours_ago <= 12, hours_ago <= 24], [10, 8, 5], 0)
+    
+    # 没有关键词命中时逐篇评分得到的是整数
+    return [float(score) if hits else int(score) for score, hits in zip(scores.tolist(), hit_counts.tolist())]
+
 def similar_title(title1, title2):
     """检查两个标题是否相似"""
     # 如果输入为None或空，认为不相似
@@ -715,5 +1434,95 @@ def similar_title(title1, title2):
     except (AttributeError, TypeError):
         return False
 
+
+class TitleDedupIndex:
+    """
+    标题近似去重索引，判定规则与similar_title一致，但无需与每个已收录标题逐一比较
+    
+    - 词汇重叠：重合度超过80%时，新标题中任意 n-need+1 个词至少有一个出现在对方标题中，
+      因此只需查询倒排表最短的几个词
+    - 标题包含：被包含标题的中间词一定是包含方的完整单词，可通过倒排表定位候选；
+      少于3个词的标题数量很少，退化为逐一比较
+    """
+
+    def __init__(self):
+        self._titles: List[str] = []  # 已收录标题（小写）
+        self._word_sets: List[Set[str]] = []  # 已收录标题的词集合缓存
+        self._postings: Dict[str, List[int]] = {}  # 单词 -> 含该词的标题下标
+        self._anchors: Dict[str, List[int]] = {}  # 锚点词 -> 以其为中间词的标题下标
+        self._short_ids: List[int] = []  # 少于3个词的标题下标
+        self._min_common: Dict[int, int] = {}
+
+    def __len__(self):
+        return len(self._titles)
+
+    def _required_common(self, size: int) -> int:
+        """词集合大小为size时，判定为相似所需的最少共同词数"""
+        if size not in self._min_common:
+            self._min_common[size] = next(c for c in range(size + 1) if c / size > 0.8)
+        return self._min_common[size]
+
+    def _posting_size(self, word: str) -> int:
+        return len(self._postings.get(word, ()))
+
+    def _is_similar(self, title: str, word_set: Set[str], index: int) -> bool:
+        """与similar_title相同的判定，使用缓存的词集合"""
+        other = self._titles[index]
+        if title in other or other in title:
+            return True
+        other_set = self._word_sets[index]
+        if not word_set or not other_set:
+            return False
+        return len(word_set & other_set) / max(len(word_set), len(other_set)) > 0.8
+
+    def find_similar(self, title: str) -> bool:
+        """是否存在与title相似的已收录标题"""
+        if not title or not self._titles:
+            return False
+        
+        words = title.split()
+        word_set = set(words)
+        
+        # 标题过短时无法利用单词边界，逐一比较
+        if len(words) < 3:
+            return any(self._is_similar(title, word_set, i) for i in range(len(self._titles)))
+        
+        candidates = set(self._short_ids)
+        
+        # 词汇重叠候选：倒排表最短的 n-need+1 个词
+        probe_size = len(word_set) - self._required_common(len(word_set)) + 1
+        for word in sorted(word_set, key=self._posting_size)[:probe_size]:
+            candidates.update(self._postings.get(word, ()))
+        
+        # 新标题包含在已收录标题中：其中间词必为对方的完整单词
+        rarest_middle = min(words[1:-1], key=self._posting_size)
+        candidates.update(self._postings.get(rarest_middle, ()))
+        
+        # 已收录标题包含在新标题中：对方的锚点词必为新标题的完整单词
+        for word in word_set:
+            candidates.update(self._anchors.get(word, ()))
+        
+        return any(self._is_similar(title, word_set, i) for i in candidates)
+
+    def add(self, title: str):
+        """收录标题"""
+        if not title:
+            return
+        
+        index = len(self._titles)
+        words = title.split()
+        word_set = set(words)
+        self._titles.append(title)
+        self._word_sets.append(word_set)
+        
+        if len(words) < 3:
+            self._short_ids.append(index)
+        else:
+            anchor = min(words[1:-1], key=self._posting_size)
+            self._anchors.setdefault(anchor, []).append(index)
+        
+        for word in word_set:
+            self._postings.setdefault(word, []).append(index)
+
 if __name__ == "__main__":
     fetch_ai_news()
\ No newline at end of file
@@ -1,23 +1,105 @@
-from jinja2 import Environment, FileSystemLoader
-from weasyprint import HTML, CSS
 import json
 import os
 from datetime import datetime
 import sys
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
-def generate_pdf(json_file, language="en"):
+import metrics
+
+# 各语言使用的模板
+TEMPLATE_FILES = {
+    "en": "template.html",
+    "zh": "template_cn.html"
+}
+
+_template_env = None
+
+def get_template_env():
+    """获取共享的Jinja2环境，模板只编译一次（首次调用时才导入Jinja2）"""
+    global _template_env
+    if _template_env is None:
+        from jinja2 import Environment, FileSystemLoader
+        _template_env = Environment(loader=FileSystemLoader('.'))
+    return _template_env
+
+def load_weasyprint():
+    """按需导入WeasyPrint，只生成Markdown时不会加载"""
+    from weasyprint import HTML, CSS
+    return HTML, CSS
+
+def preload_templates():
+    """预先编译所有模板，使进程池中的子进程直接继承编译结果"""
+    env = get_template_env()
+    for template_file in TEMPLATE_FILES.values():
+        env.get_template(template_file)
+
+def build_reports(jobs, max_workers=None, markdown_only=False):
+    """
+    统一的报告生成入口：并行渲染多个 (JSON文件, 语言) 任务的PDF和Markdown
+    
+    模板和WeasyPrint在父进程中加载一次，子进程通过fork继承，
+    总耗时取决于最慢的单个渲染任务
+    
+    Args:
+        jobs: (json_file, language) 列表
+        max_workers: 进程数，默认与任务数相同
+        markdown_only: 只生成Markdown，不加载Jinja2和WeasyPrint
+    
+    Returns:
+        与jobs顺序一致的PDF文件路径列表（markdown_only时为Markdown文件路径），失败的任务为None
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return []
+    
+    # 只生成Markdown时开销很小，直接在当前进程中完成
+    if markdown_only:
+        return [generate_pdf(json_file, language, markdown_only=True) for json_file, language in jobs]
+    
+    try:
+        preload_templates()
+        load_weasyprint()
+    except Exception as e:
+        # 每个任务会各自报告具体错误
+        print(f"预加载模板或WeasyPrint失败: {str(e)}")
+    
+    if len(jobs) == 1:
+        return [generate_pdf(*jobs[0])]
+    
+    # fork方式启动的子进程直接复用已导入的模块和编译好的模板
+    if "fork" in multiprocessing.get_all_start_methods():
+        mp_context = multiprocessing.get_context("fork")
+    else:
+        mp_context = None
+    
+    workers = max_workers or len(jobs)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as executor:
+        futures = [executor.submit(_generate_pdf_in_worker, json_file, language) for json_file, language in jobs]
+        return [future.result() for future in futures]
+
+def _generate_pdf_in_worker(json_file, language):
+    """在进程池中生成报告，完成后写出本进程的运行指标（进程池的子进程退出时不会执行atexit）"""
+    try:
+        return generate_pdf(json_file, language)
+    finally:
+        metrics.flush()
+
+def generate_pdf(json_file, language="en", markdown_only=False):
     """
     从JSON新闻数据文件生成PDF报告
     
     Args:
         json_file: 包含新闻文章的JSON文件路径
         language: 语言，'en'表示英文，'zh'表示中文
+        markdown_only: 只生成Markdown报告
     
     Returns:
-        生成的PDF文件路径
+        生成的PDF文件路径，markdown_only时为Markdown文件路径
     """
     try:
-        print(f"正在从{json_file}生成{language}语言的PDF和Markdown报告...")
+        report_types = "Markdown" if markdown_only else "PDF和Markdown"
+        print(f"正在从{json_file}生成{language}语言的{report_types}报告...")
         
         # 确保文件存在
         if not os.path.isfile(json_file):
@@ -38,11 +120,22 @@ def generate_pdf(json_file, language="en"):
         if not articles:
             print("警告: 没有找到文章，将生成空报告")
         
+        today = os.environ.get('TODAY', datetime.now().strftime("%Y-%m-%d"))
+        
+        # 语言后缀
+        lang_suffix = '' if language == 'en' else '_cn'
+        
+        if markdown_only:
+            md_filename = f'ai_news{lang_suffix}_{today}.md'
+            with metrics.span("render.markdown", language=language):
+                generate_markdown(articles, md_filename, language, today)
+            print(f"Markdown报告已生成: {md_filename}")
+            return md_filename
+        
         # 选择模板
-        template_file = 'template.html' if language == 'en' else 'template_cn.html'
+        template_file = TEMPLATE_FILES['en'] if language == 'en' else TEMPLATE_FILES['zh']
         
         # 准备模板数据
-        today = datetime.now().strftime("%Y-%m-%d")
         template_data = {
             "articles": articles,
             "date": today,
@@ -50,21 +143,20 @@ def generate_pdf(json_file, language="en"):
             "generation_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
             
-        # 加载HTML模板
-        env = Environment(loader=FileSystemLoader('.'))
-        template = env.get_template(template_file)
-        
-        # 渲染HTML
-        html_content = template.render(**template_data)
-
-        # 语言后缀
-        lang_suffix = '' if language == 'en' else '_cn'
+        with metrics.span("render.template", language=language):
+            # 加载HTML模板
+            template = get_template_env().get_template(template_file)
+            
+            # 渲染HTML
+            html_content = template.render(**template_data)
         
         # 生成临时HTML文件以便调试
         temp_html_file = f'temp_report{lang_suffix}_{today}.html'
         with open(temp_html_file, 'w', encoding='utf-8') as f:
             f.write(html_content)
         
+        HTML, CSS = load_weasyprint()
+        
         # 添加自定义CSS解决中文字体问题
         font_css = CSS(string='''
             @font-face {
@@ -80,16 +172,20 @@ def generate_pdf(json_file, language="en"):
         html = HTML(string=html_content)
         pdf_filename = f'ai_news{lang_suffix}_{today}.pdf'
         
-        if font_css:
-            html.write_pdf(pdf_filename, stylesheets=[font_css])
-        else:
-            html.write_pdf(pdf_filename)
+        with metrics.span("render.pdf", language=language) as span:
+            if font_css:
+                html.write_pdf(pdf_filename, stylesheets=[font_css])
+            else:
+                html.write_pdf(pdf_filename)
+            span.fields["articles"] = len(articles)
+            span.fields["bytes"] = os.path.getsize(pdf_filename)
             
         print(f"PDF报告已生成: {pdf_filename}")
         
         # 生成Markdown文件
         md_filename = f'ai_news{lang_suffix}_{today}.md'
-        generate_markdown(articles, md_filename, language, today)
+        with metrics.span("render.markdown", language=language):
+            generate_markdown(articles, md_filename, language, today)
         print(f"Markdown报告已生成: {md_filename}")
         
         return pdf_filename
@@ -172,17 +268,32 @@ def generate_markdown(articles, output_file, language="en", date_str=None):
     with open(output_file, "w", encoding="utf-8") as f:
         f.write("\n".join(md_content))
 
+def parse_jobs(args):
+    """
+    解析命令行参数为 (JSON文件, 语言) 列表
+    
+    每个JSON文件后面可以跟一个语言选项，省略时为英文
+    """
+    jobs = []
+    for arg in args:
+        if arg in ('en', 'zh') and jobs:
+            jobs[-1] = (jobs[-1][0], arg)
+        else:
+            jobs.append((arg, 'en'))
+    return jobs
+
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("使用方法: python generate_pdf.py <json文件路径> [语言]")
+    args = sys.argv[1:]
+    markdown_only = "--markdown-only" in args
+    args = [arg for arg in args if arg != "--markdown-only"]
+    
+    if not args:
+        print("使用方法: python generate_pdf.py [--markdown-only] <json文件路径> [语言] [<json文件路径> [语言] ...]")
         print("语言选项: en(英文,默认), zh(中文)")
+        print("指定多个文件时并行生成，例如: python generate_pdf.py ai_news.json en ai_news_cn.json zh")
+        print("--markdown-only: 只生成Markdown，不加载WeasyPrint")
         sys.exit(1)
     
-    # 确定语言
-    language = 'en'
-    if len(sys.argv) > 2 and sys.argv[2] == 'zh':
-        language = 'zh'
-    
-    pdf_file = generate_pdf(sys.argv[1], language)
-    if not pdf_file:
+    report_files = build_reports(parse_jobs(args), markdown_only=markdown_only)
+    if not all(report_files):
         sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,215 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import metrics
+
+# requests在首次发出请求时才导入，只使用评分、去重等本地功能的脚本不必加载它
+
+# 共享HTTP客户端配置
+HTTP_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", "10"))  # 每个主机保持的长连接数
+HTTP_MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", "3"))  # 连接错误和5xx/429的重试次数（仅限GET）
+HTTP_BACKOFF_FACTOR = float(os.environ.get("HTTP_BACKOFF_FACTOR", "0.5"))  # 指数退避系数
+HTTP_CACHE_DIR = os.environ.get("HTTP_CACHE_DIR", ".http_cache")  # 响应缓存目录，设为空字符串则禁用
+HTTP_CACHE_TTL = int(os.environ.get("HTTP_CACHE_TTL", "3600"))  # 缓存有效期（秒），期内直接使用缓存不发请求
+HTTP_CACHE_MAX_AGE_DAYS = float(os.environ.get("HTTP_CACHE_MAX_AGE_DAYS", "7"))  # 超过该天数未更新的缓存条目被清理
+
+# 不参与缓存键计算的请求头：凭据每次运行可能不同（例如Actions的GITHUB_TOKEN），不应影响缓存命中
+_CREDENTIAL_HEADERS = frozenset(["authorization", "proxy-authorization", "cookie", "x-api-key"])
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> "requests.Session":
+    """获取进程内共享的Session，各主机的连接池在所有调用之间复用"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+                
+                retry = Retry(
+                    total=HTTP_MAX_RETRIES,
+                    backoff_factor=HTTP_BACKOFF_FACTOR,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=frozenset(["GET", "HEAD"]),
+                    respect_retry_after_header=True,
+                    raise_on_status=False
+                )
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def post(url, **kwargs) -> "requests.Response":
+    """通过共享Session发送POST请求（不缓存、不自动重试）"""
+    with metrics.span("http.request", method="POST", host=urlparse(url).netloc) as span:
+        response = get_session().post(url, **kwargs)
+        _record_response(span, response)
+    return response
+
+
+def _record_response(span, response):
+    """在请求的span中记录状态码、响应字节数和urllib3自动重试的次数"""
+    span.labels["status"] = response.status_code
+    span.fields["bytes"] = len(response.content or b"")
+    retries = getattr(getattr(response, "raw", None), "retries", None)
+    retried = len(retries.history) if retries is not None else 0
+    if retried:
+        span.fields["retries"] = retried
+        metrics.incr("http.retries", retried, host=span.labels["host"])
+
+
+def _cache_key(url, params, headers) -> str:
+    """由URL、查询参数和凭据以外的请求头计算缓存键，查询参数中的密钥只以哈希形式出现在文件名中"""
+    headers = [(k, v) for k, v in (headers or {}).items() if k.lower() not in _CREDENTIAL_HEADERS]
+    raw = json.dumps([url, sorted((params or {}).items()), sorted(headers)],
+                     ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _cache_path(key) -> str:
+    return os.path.join(HTTP_CACHE_DIR, f"{key}.json")
+
+
+def _load_cache_entry(key):
+    """读取缓存条目，不存在或损坏时返回None"""
+    try:
+        with open(_cache_path(key), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _store_cache_entry(key, entry):
+    """原子写入缓存条目"""
+    try:
+        os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+        path = _cache_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logging.error(f"写入HTTP缓存失败: {e}")
+
+
+def prune_cache(max_age_days=None) -> int:
+    """删除超过max_age_days（默认HTTP_CACHE_MAX_AGE_DAYS）未更新的缓存条目及遗留的临时文件，返回删除的文件数"""
+    if max_age_days is None:
+        max_age_days = HTTP_CACHE_MAX_AGE_DAYS
+    if not HTTP_CACHE_DIR or not os.path.isdir(HTTP_CACHE_DIR):
+        return 0
+    cutoff = time.time() - max_age_days * 86400
+    removed = 0
+    for name in os.listdir(HTTP_CACHE_DIR):
+        path = os.path.join(HTTP_CACHE_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+def _response_from_cache(entry, url) -> "requests.Response":
+    """由缓存条目构造Response对象，调用方可以像使用真实响应一样使用它"""
+    import requests
+    from requests.structures import CaseInsensitiveDict
+    
+    response = requests.Response()
+    response.status_code = entry["status_code"]
+    response.headers = CaseInsensitiveDict(entry.get("headers", {}))
+    response._content = base64.b64decode(entry["content"])
+    response.encoding = entry.get("encoding")
+    response.url = url
+    response.from_cache = True
+    return response
+
+
+def cached_get(url, params=None, headers=None, timeout=None, ttl=None) -> "requests.Response":
+    """
+    带磁盘缓存的GET请求
+
+    - 缓存未过期：直接返回缓存，不发送请求
+    - 缓存已过期：携带If-None-Match/If-Modified-Since发送条件请求，304时沿用缓存
+    - 只缓存200响应
+
+    Args:
+        url: 请求地址
+        params: 查询参数
+        headers: 请求头
+        timeout: 请求超时（秒）
+        ttl: 缓存有效期（秒），默认HTTP_CACHE_TTL
+
+    Returns:
+        requests.Response，来自缓存时from_cache属性为True
+    """
+    host = urlparse(url).netloc
+    with metrics.span("http.request", method="GET", host=host) as span:
+        response, cache_state = _cached_get(url, params, headers, timeout, ttl)
+        span.labels["cache"] = cache_state
+        _record_response(span, response)
+    metrics.incr("http.cache", cache=cache_state, host=host)
+    return response
+
+
+def _cached_get(url, params, headers, timeout, ttl):
+    """cached_get的实现，返回 (响应, 缓存状态)；缓存状态为off、hit、revalidated或miss"""
+    if ttl is None:
+        ttl = HTTP_CACHE_TTL
+    session = get_session()
+
+    if not HTTP_CACHE_DIR:
+        response = session.get(url, params=params, headers=headers, timeout=timeout)
+        response.from_cache = False
+        return response, "off"
+
+    key = _cache_key(url, params, headers)
+    entry = _load_cache_entry(key)
+    now = time.time()
+
+    if entry and now - entry.get("stored_at", 0) < ttl:
+        return _response_from_cache(entry, url), "hit"
+
+    request_headers = dict(headers or {})
+    if entry:
+        if entry.get("etag"):
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            request_headers["If-Modified-Since"] = entry["last_modified"]
+
+    response = session.get(url, params=params, headers=request_headers, timeout=timeout)
+
+    if response.status_code == 304 and entry:
+        entry.pop("url", None)  # 旧版本写入的完整URL含有密钥参数，改写时去掉
+        entry["stored_at"] = now
+        _store_cache_entry(key, entry)
+        return _response_from_cache(entry, url), "revalidated"
+
+    response.from_cache = False
+    if response.status_code == 200:
+        # 不保存完整URL：查询参数中可能含有API密钥，而缓存目录会随Actions缓存上传
+        _store_cache_entry(key, {
+            "status_code": response.status_code,
+            "headers": {k: v for k, v in response.headers.items()
+                        if k.lower() in ("content-type", "etag", "last-modified")},
+            "encoding": response.encoding,
+            "content": base64.b64encode(response.content).decode('ascii'),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "stored_at": now
+        })
+    return response, "miss"
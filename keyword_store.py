@@ -0,0 +1,103 @@
+import array
+import os
+import sqlite3
+
+# 每个关键词保留的历史权重个数
+HISTORY_SLOTS = 10
+
+
+def pack_history(history):
+    """将最近HISTORY_SLOTS个历史权重打包为定长double数组"""
+    return array.array('d', history[-HISTORY_SLOTS:]).tobytes()
+
+
+def unpack_history(blob):
+    """解包历史权重"""
+    values = array.array('d')
+    if blob:
+        values.frombytes(blob)
+    return values.tolist()
+
+
+class SQLiteKeywordStore:
+    """
+    热门关键词的紧凑存储（SQLite）
+
+    词表以word为主键，每行保存权重、最近出现时间和打包的历史权重。
+    权重按meta表中的参考时间存储，加载后再按经过的时间衰减，
+    因此只有本次变化的关键词需要写入；每次保存都在一个事务中完成
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS keywords ("
+            "word TEXT PRIMARY KEY, weight REAL NOT NULL, last_seen REAL NOT NULL, history BLOB"
+            ") WITHOUT ROWID"
+        )
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value REAL)")
+        return conn
+
+    def load(self):
+        """
+        读取全部关键词
+
+        Returns:
+            (权重, 历史权重, 最近出现时间, 权重参考时间)，参考时间在空库中为None
+        """
+        conn = self._connect()
+        try:
+            weights, history, last_seen = {}, {}, {}
+            for word, weight, seen, blob in conn.execute("SELECT word, weight, last_seen, history FROM keywords"):
+                weights[word] = weight
+                last_seen[word] = seen
+                history[word] = unpack_history(blob)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'reference_time'").fetchone()
+            return weights, history, last_seen, (row[0] if row else None)
+        finally:
+            conn.close()
+
+    def reference_time(self):
+        """当前存储的权重参考时间，空库返回None"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'reference_time'").fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+
+    def save(self, rows, deleted=(), reference_time=None, replace_all=False, updated_at=None):
+        """
+        原子写入关键词
+
+        Args:
+            rows: (word, weight, last_seen, history) 可迭代对象，权重须以reference_time为基准
+            deleted: 要删除的关键词
+            reference_time: 新的权重参考时间，None表示不变
+            replace_all: 先清空再写入（全量重写）
+            updated_at: 最后更新时间戳
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                if replace_all:
+                    conn.execute("DELETE FROM keywords")
+                conn.executemany(
+                    "INSERT OR REPLACE INTO keywords (word, weight, last_seen, history) VALUES (?, ?, ?, ?)",
+                    ((word, weight, seen, pack_history(history)) for word, weight, seen, history in rows)
+                )
+                conn.executemany("DELETE FROM keywords WHERE word = ?", ((word,) for word in deleted))
+                if reference_time is not None:
+                    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('reference_time', ?)",
+                                 (reference_time,))
+                if updated_at is not None:
+                    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_updated', ?)",
+                                 (updated_at,))
+        finally:
+            conn.close()
@@ -0,0 +1,300 @@
+"""
+运行指标：记录各阶段和每个外部请求的耗时(span)及计数(counter)，进程退出时以JSON lines追加写入运行报告
+
+抓取、翻译、渲染在各自的进程中执行，都追加写入同一个按日期命名的报告文件（与简报文件放在一起），
+由流水线启动的进程带有相同的run_id。每行一条记录:
+
+    {"type": "span", "run_id": ..., "process": "fetch_ai_news", "name": "http.request",
+     "start": 1700000000.0, "duration_ms": 12.3, "labels": {"host": ..., "status": 200}, "fields": {"bytes": 2048}}
+    {"type": "counter", "run_id": ..., "process": "translate", "name": "translate.memory_hits",
+     "labels": {}, "value": 12}
+
+labels 是用于分组的维度（主机、状态码、阶段状态等），fields 是数值（字节数、重试次数、文章数等）
+
+使用方法:
+    python metrics.py ai_news_metrics_2025-01-01.jsonl [--last] [--compare 之前的报告.jsonl] [--prometheus]
+"""
+import argparse
+import atexit
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+METRICS_FILE = os.environ.get("METRICS_FILE", "ai_news_metrics_{date}.jsonl")  # 运行报告文件，{date}替换为简报日期，设为空字符串则不记录
+METRICS_RUN_ID = os.environ.get("METRICS_RUN_ID") or f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+
+
+class Span:
+    """span()返回的对象，代码块内可以补充labels和fields"""
+
+    __slots__ = ("labels", "fields")
+
+    def __init__(self, labels):
+        self.labels = labels
+        self.fields = {}
+
+
+class MetricsRecorder:
+    """
+    进程内的指标记录器，可在多个线程中同时使用
+
+    通过fork启动的子进程（例如PDF渲染进程池）会清空继承来的记录，只写入自己产生的记录
+    """
+
+    def __init__(self, enabled=True, run_id=METRICS_RUN_ID):
+        self.enabled = enabled
+        self.run_id = run_id
+        self.process = os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0] or "python"
+        self._spans = []
+        self._counters = {}  # (名称, 排序后的labels) -> 累计值
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self._spans = []
+            self._counters = {}
+
+    @contextmanager
+    def span(self, name, **labels):
+        """
+        记录代码块的耗时；代码块抛出异常时在labels中记录异常类型后继续抛出
+
+            with metrics.span("http.request", method="GET") as s:
+                response = ...
+                s.labels["status"] = response.status_code
+                s.fields["bytes"] = len(response.content)
+        """
+        current = Span(labels)
+        if not self.enabled:
+            yield current
+            return
+        start = time.time()
+        started = time.perf_counter()
+        try:
+            yield current
+        except BaseException as e:
+            current.labels["error"] = type(e).__name__
+            raise
+        finally:
+            record = {
+                "type": "span",
+                "name": name,
+                "start": round(start, 6),
+                "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                "labels": current.labels,
+                "fields": current.fields
+            }
+            with self._lock:
+                self._spans.append(record)
+
+    def incr(self, name, value=1, **labels):
+        """累加计数器"""
+        if not self.enabled or not value:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def records(self):
+        """取出当前所有记录并清空"""
+        with self._lock:
+            spans, counters = self._spans, self._counters
+            self._spans, self._counters = [], {}
+        common = {"run_id": self.run_id, "process": self.process}
+        records = [dict(common, **span) for span in spans]
+        records.extend(dict(common, type="counter", name=name, labels=dict(labels), value=value)
+                       for (name, labels), value in sorted(counters.items()))
+        return records
+
+    def flush(self, path):
+        """把尚未写出的记录追加到path，一次写入，多个进程同时追加时各自的行不会交错"""
+        records = self.records()
+        if not records:
+            return 0
+        lines = "".join(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in records)
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError as e:
+            print(f"写入运行报告失败: {e}")
+            return 0
+        return len(records)
+
+
+_recorder = MetricsRecorder(enabled=bool(METRICS_FILE))
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_recorder.reset)
+
+
+def span(name, **labels):
+    return _recorder.span(name, **labels)
+
+
+def incr(name, value=1, **labels):
+    _recorder.incr(name, value, **labels)
+
+
+def report_path(date=None):
+    """当天运行报告的路径，未启用时返回None"""
+    if not METRICS_FILE:
+        return None
+    date = date or os.environ.get("TODAY", datetime.now().strftime("%Y-%m-%d"))
+    return METRICS_FILE.replace("{date}", date)
+
+
+def flush():
+    """写出当前进程尚未写出的记录，进程退出时自动调用"""
+    path = report_path()
+    if path:
+        return _recorder.flush(path)
+    return 0
+
+
+atexit.register(flush)
+
+
+def load_report(path, last_run=False):
+    """读取运行报告，last_run时只保留最后一次运行的记录"""
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    if last_run and records:
+        run_id = records[-1].get("run_id")
+        records = [record for record in records if record.get("run_id") == run_id]
+    return records
+
+
+def _percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def summarize(records):
+    """
+    按 (名称, labels) 汇总
+
+    Returns:
+        (span汇总列表, counter汇总列表)；span汇总包含count/total_ms/p50_ms/p95_ms/max_ms和各field之和
+    """
+    groups = {}
+    counters = {}
+    for record in records:
+        labels = tuple(sorted((k, str(v)) for k, v in (record.get("labels") or {}).items()))
+        key = (record.get("name"), labels)
+        if record.get("type") == "span":
+            group = groups.setdefault(key, {"durations": [], "fields": {}})
+            group["durations"].append(record.get("duration_ms", 0.0))
+            for field, value in (record.get("fields") or {}).items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    group["fields"][field] = group["fields"].get(field, 0) + value
+        elif record.get("type") == "counter":
+            counters[key] = counters.get(key, 0) + record.get("value", 0)
+
+    spans = []
+    for (name, labels), group in sorted(groups.items()):
+        durations = sorted(group["durations"])
+        spans.append({
+            "name": name, "labels": dict(labels), "count": len(durations),
+            "total_ms": sum(durations), "p50_ms": _percentile(durations, 0.5),
+            "p95_ms": _percentile(durations, 0.95), "max_ms": durations[-1], "fields": group["fields"]
+        })
+    counter_list = [{"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(counters.items())]
+    return spans, counter_list
+
+
+def _format_labels(labels):
+    return ",".join(f"{k}={v}" for k, v in labels.items())
+
+
+def _prometheus_name(name):
+    return "ai_news_" + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def _prometheus_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in labels.values())
+    return "{" + ",".join(f'{re.sub(r"[^a-zA-Z0-9_]", "_", k)}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+def to_prometheus(spans, counters):
+    """转换为Prometheus文本格式（可写入node_exporter的textfile目录）"""
+    lines = ["# TYPE ai_news_span_seconds summary"]
+    for s in spans:
+        labels = dict({"span": s["name"]}, **s["labels"])
+        lines.append(f"ai_news_span_seconds_count{_prometheus_labels(labels)} {s['count']}")
+        lines.append(f"ai_news_span_seconds_sum{_prometheus_labels(labels)} {s['total_ms'] / 1000:.6f}")
+        for field, value in sorted(s["fields"].items()):
+            lines.append(f"ai_news_span_field_total{_prometheus_labels(dict(labels, field=field))} {value}")
+    declared = set()
+    for c in counters:
+        metric = _prometheus_name(c["name"]) + "_total"
+        if metric not in declared:
+            lines.append(f"# TYPE {metric} counter")
+            declared.add(metric)
+        lines.append(f"{metric}{_prometheus_labels(c['labels'])} {c['value']}")
+    return "\n".join(lines) + "\n"
+
+
+def print_summary(spans, counters, baseline=None):
+    """打印汇总表；提供baseline（另一份报告的span汇总）时按名称对比总耗时"""
+    print(f"{'span':<22} {'labels':<52} {'次数':>6} {'总耗时(ms)':>12} {'p50':>9} {'p95':>9} {'max':>9}  fields")
+    for s in spans:
+        fields = " ".join(f"{k}={v:g}" for k, v in sorted(s["fields"].items()))
+        print(f"{s['name']:<22} {_format_labels(s['labels'])[:52]:<52} {s['count']:>6} {s['total_ms']:>12.1f} "
+              f"{s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['max_ms']:>9.1f}  {fields}")
+
+    if counters:
+        print()
+        print(f"{'counter':<32} {'labels':<52} {'值':>10}")
+        for c in counters:
+            print(f"{c['name']:<32} {_format_labels(c['labels'])[:52]:<52} {c['value']:>10g}")
+
+    if baseline is not None:
+        def totals(items):
+            result = {}
+            for s in items:
+                result[s["name"]] = result.get(s["name"], 0.0) + s["total_ms"]
+            return result
+
+        current, previous = totals(spans), totals(baseline)
+        print()
+        print(f"{'span':<22} {'本次(ms)':>12} {'对比(ms)':>12} {'变化':>8}")
+        for name in sorted(set(current) | set(previous)):
+            now, before = current.get(name, 0.0), previous.get(name, 0.0)
+            change = f"{(now / before - 1) * 100:+.0f}%" if before else "-"
+            print(f"{name:<22} {now:>12.1f} {before:>12.1f} {change:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="汇总运行报告")
+    parser.add_argument("report", help="运行报告文件（JSON lines）")
+    parser.add_argument("--last", action="store_true", help="只汇总最后一次运行")
+    parser.add_argument("--compare", help="与另一份运行报告（例如前一天的）对比各span的总耗时")
+    parser.add_argument("--prometheus", action="store_true", help="输出Prometheus文本格式")
+    args = parser.parse_args()
+
+    spans, counters = summarize(load_report(args.report, args.last))
+    if args.prometheus:
+        sys.stdout.write(to_prometheus(spans, counters))
+        return
+    baseline = summarize(load_report(args.compare, args.last))[0] if args.compare else None
+    print_summary(spans, counters, baseline)
+
+
+if __name__ == "__main__":
+    # 汇总命令本身不产生运行记录
+    _recorder.enabled = False
+    main()
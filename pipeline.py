@@ -0,0 +1,327 @@
+"""
+每日流水线：抓取(含去重和评分) -> 翻译 -> 渲染，按依赖关系组成DAG执行
+
+- 每个阶段的输出以 (阶段, 配置, 代码和输入文件内容) 的哈希为键缓存在 PIPELINE_CACHE_DIR 中，
+  重新运行时输入未变化的阶段直接从缓存恢复输出，不再执行
+- 互不依赖的阶段并行执行；中英文报告在同一个渲染阶段中由 generate_pdf.build_reports 的进程池并行生成，
+  解释器启动和WeasyPrint加载只发生一次
+- 某个阶段失败时，已完成阶段的结果仍然写入缓存，修复后重新运行即可从失败处继续，不会重新抓取
+- 阶段脚本通过 degraded.mark_degraded() 报告降级产出（示例数据、部分未翻译等），这类产出供下游使用但不写入缓存
+- 各阶段的状态和耗时与子进程记录的指标一起写入当天的运行报告（见 metrics.py）
+
+使用方法:
+    python pipeline.py [--force 阶段名 ...] [--markdown-only]
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+
+import http_client
+import metrics
+from degraded import DEGRADED_MARKER_ENV, read_degraded_marker
+
+PIPELINE_CACHE_DIR = os.environ.get("PIPELINE_CACHE_DIR", ".pipeline_cache")  # 阶段产物缓存目录
+PIPELINE_CACHE_MAX_AGE_DAYS = float(os.environ.get("PIPELINE_CACHE_MAX_AGE_DAYS", "7"))  # 超过该天数的缓存条目被清理
+PIPELINE_WORKERS = int(os.environ.get("PIPELINE_WORKERS", "2"))  # 同时执行的阶段数
+
+# 影响抓取结果的环境变量（不含密钥）
+FETCH_CONFIG_ENV = [
+    "NEWSAPI_MAX_PAGES", "NEWSAPI_MAX_RESULTS", "CONCURRENT_FETCH", "TOP_K", "MAX_ARTICLES_PER_SOURCE",
+    "KEYWORD_HALF_LIFE_DAYS", "KEYWORD_MAX_AGE_DAYS", "KEYWORD_MAX_ENTRIES", "SOURCE_TIERS_FILE",
+    "DEDUP_RETENTION_DAYS"
+]
+
+# 各阶段脚本导入的本地模块，任一文件变化都会使依赖它的阶段缓存失效
+FETCH_MODULES = ["fetch_ai_news.py", "http_client.py", "keyword_store.py", "dedup_store.py",
+                 "archive_store.py", "metrics.py", "degraded.py"]
+TRANSLATE_MODULES = ["translate.py", "http_client.py", "archive_store.py", "metrics.py", "degraded.py"]
+RENDER_MODULES = ["generate_pdf.py", "metrics.py"]
+
+_print_lock = threading.Lock()
+
+
+def log(message):
+    with _print_lock:
+        print(f"[pipeline] {message}", flush=True)
+
+
+def file_digest(path):
+    """文件内容的sha256，文件不存在时为None"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+class Stage:
+    """
+    流水线阶段
+
+    Args:
+        name: 阶段名
+        command: 执行的命令（参数列表）
+        outputs: 产出的文件
+        deps: 依赖的阶段名
+        inputs: 参与缓存键计算的文件（代码、模板、上游产出）
+        config: 参与缓存键计算的配置
+        fallback: 命令失败时调用，返回True表示已生成可供下游使用的替代产出（不写入缓存）
+    """
+
+    def __init__(self, name, command, outputs, deps=(), inputs=(), config=None, fallback=None):
+        self.name = name
+        self.command = command
+        self.outputs = list(outputs)
+        self.deps = list(deps)
+        self.inputs = list(inputs)
+        self.config = config or {}
+        self.fallback = fallback
+
+    def cache_key(self):
+        """由阶段名、配置和输入文件内容计算缓存键"""
+        raw = json.dumps({
+            "stage": self.name,
+            "command": self.command[1:],  # 不含解释器路径
+            "config": self.config,
+            "inputs": {path: file_digest(path) for path in self.inputs}
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class ArtifactCache:
+    """按 阶段/缓存键 保存阶段产出文件"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _entry_dir(self, stage, key):
+        return os.path.join(self.root, stage.name, key)
+
+    def restore(self, stage, key):
+        """缓存命中时把产出复制回工作目录并返回True"""
+        entry = self._entry_dir(stage, key)
+        cached = [os.path.join(entry, os.path.basename(path)) for path in stage.outputs]
+        if not os.path.isfile(os.path.join(entry, "meta.json")) or not all(map(os.path.isfile, cached)):
+            return False
+        for source, target in zip(cached, stage.outputs):
+            if file_digest(source) != file_digest(target):
+                shutil.copy2(source, target)
+        return True
+
+    def store(self, stage, key):
+        """保存阶段产出，先写入临时目录再重命名，中断时不会留下不完整的条目"""
+        entry = self._entry_dir(stage, key)
+        tmp_entry = f"{entry}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+        os.makedirs(tmp_entry)
+        for path in stage.outputs:
+            shutil.copy2(path, os.path.join(tmp_entry, os.path.basename(path)))
+        with open(os.path.join(tmp_entry, "meta.json"), 'w', encoding='utf-8') as f:
+            json.dump({"stage": stage.name, "outputs": stage.outputs, "created": time.time()}, f)
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp_entry, entry)
+
+    def prune(self, max_age_days):
+        """删除超过保留期的缓存条目"""
+        cutoff = time.time() - max_age_days * 86400
+        removed = 0
+        if not os.path.isdir(self.root):
+            return removed
+        for stage_name in os.listdir(self.root):
+            stage_dir = os.path.join(self.root, stage_name)
+            if not os.path.isdir(stage_dir):
+                continue
+            for key in os.listdir(stage_dir):
+                entry = os.path.join(stage_dir, key)
+                try:
+                    with open(os.path.join(entry, "meta.json"), 'r', encoding='utf-8') as f:
+                        created = json.load(f)["created"]
+                except (OSError, ValueError, KeyError):
+                    created = 0
+                if created < cutoff:
+                    shutil.rmtree(entry, ignore_errors=True)
+                    removed += 1
+        return removed
+
+
+class Pipeline:
+    """按依赖关系并行执行各阶段，输入未变化的阶段从缓存恢复"""
+
+    def __init__(self, stages, cache, workers=PIPELINE_WORKERS, force=()):
+        self.stages = {stage.name: stage for stage in stages}
+        self.cache = cache
+        self.workers = workers
+        self.force = set(force)
+        for stage in stages:
+            missing = [dep for dep in stage.deps if dep not in self.stages]
+            if missing:
+                raise ValueError(f"阶段 {stage.name} 依赖未知阶段: {', '.join(missing)}")
+
+    def _run_stage(self, stage):
+        """
+        执行单个阶段，状态和耗时记入运行报告
+
+        Returns:
+            "cached"、"done"、"degraded"、"fallback" 或 "failed"
+        """
+        with metrics.span("pipeline.stage", stage=stage.name) as span:
+            span.labels["status"] = self._execute_stage(stage)
+        return span.labels["status"]
+
+    def _execute_stage(self, stage):
+        # 缓存键依赖上游产出的内容，必须在上游完成后计算
+        key = stage.cache_key()
+        if stage.name not in self.force and "all" not in self.force and self.cache.restore(stage, key):
+            log(f"{stage.name}: 输入未变化，使用缓存 ({key[:12]})")
+            return "cached"
+
+        log(f"{stage.name}: 开始执行 {' '.join(stage.command[1:])}")
+        marker = os.path.abspath(f".{stage.name}.{os.getpid()}.degraded")
+        if os.path.exists(marker):
+            os.remove(marker)
+        start = time.perf_counter()
+        result = subprocess.run(stage.command, env=dict(os.environ, **{DEGRADED_MARKER_ENV: marker}))
+        elapsed = time.perf_counter() - start
+        degraded = read_degraded_marker(marker)
+
+        if result.returncode == 0 and all(os.path.isfile(path) for path in stage.outputs):
+            if degraded:
+                log(f"{stage.name}: 产出为降级结果（{'; '.join(degraded)}），不写入缓存，耗时 {elapsed:.1f}s")
+                return "degraded"
+            self.cache.store(stage, key)
+            log(f"{stage.name}: 完成，耗时 {elapsed:.1f}s")
+            return "done"
+
+        log(f"{stage.name}: 失败（退出码 {result.returncode}），耗时 {elapsed:.1f}s")
+        if stage.fallback is not None and stage.fallback():
+            log(f"{stage.name}: 已使用替代产出，下次运行时重试")
+            return "fallback"
+        return "failed"
+
+    def run(self):
+        """执行流水线，返回 阶段名 -> 状态；依赖失败的阶段状态为 "skipped" """
+        status = {}
+        pending = dict(self.stages)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while pending or running:
+                # 跳过的阶段可能使更多下游阶段被跳过，直到没有变化为止
+                changed = True
+                while changed:
+                    changed = False
+                    for name, stage in list(pending.items()):
+                        dep_status = [status.get(dep) for dep in stage.deps]
+                        if any(s in ("failed", "skipped") for s in dep_status):
+                            status[name] = "skipped"
+                            log(f"{name}: 上游阶段失败，跳过")
+                        elif all(s is not None for s in dep_status):
+                            running[executor.submit(self._run_stage, stage)] = name
+                        else:
+                            continue
+                        del pending[name]
+                        changed = True
+
+                if not running:
+                    if pending:
+                        raise ValueError(f"阶段依赖存在环: {', '.join(pending)}")
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        status[name] = future.result()
+                    except Exception as e:
+                        log(f"{name}: 执行出错: {e}")
+                        status[name] = "failed"
+        return status
+
+
+def build_daily_stages(date, markdown_only=False):
+    """每日简报的阶段定义"""
+    python = sys.executable
+    en_json = f"ai_news_{date}.json"
+    zh_json = f"ai_news_cn_{date}.json"
+
+    render_outputs = []
+    for suffix in ("", "_cn"):
+        if not markdown_only:
+            render_outputs.append(f"ai_news{suffix}_{date}.pdf")
+        render_outputs.append(f"ai_news{suffix}_{date}.md")
+
+    # 中英文报告交给同一个generate_pdf.py进程，由build_reports的进程池并行渲染
+    render_command = [python, "generate_pdf.py", en_json, "en", zh_json, "zh"]
+    if markdown_only:
+        render_command.append("--markdown-only")
+
+    def translation_fallback():
+        # 翻译失败时用英文内容生成中文报告，与原工作流的处理一致
+        if not os.path.isfile(en_json):
+            return False
+        print(f"警告: 翻译失败，复制 {en_json} 用于中文报告生成")
+        shutil.copyfile(en_json, zh_json)
+        return True
+
+    return [
+        Stage(
+            "fetch", [python, "fetch_ai_news.py"], [en_json],
+            inputs=FETCH_MODULES + [os.environ.get("SOURCE_TIERS_FILE", "source_tiers.json")],
+            config={"date": date, "env": {name: os.environ.get(name) for name in FETCH_CONFIG_ENV}}
+        ),
+        Stage(
+            "translate", [python, "translate.py", en_json], [zh_json], deps=["fetch"],
+            inputs=TRANSLATE_MODULES + [en_json],
+            config={"model": os.environ.get("ZHIPU_MODEL"), "date": date},
+            fallback=translation_fallback
+        ),
+        Stage(
+            "render", render_command, render_outputs, deps=["fetch", "translate"],
+            inputs=RENDER_MODULES + ["template.html", "template_cn.html", en_json, zh_json],
+            config={"date": date}
+        ),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="每日简报流水线")
+    parser.add_argument("--force", nargs="*", default=[], help="忽略缓存重新执行的阶段，all表示全部")
+    parser.add_argument("--markdown-only", action="store_true", help="只生成Markdown报告")
+    args = parser.parse_args()
+
+    date = os.environ.get('TODAY', datetime.now().strftime('%Y-%m-%d'))
+    # 子进程使用同一个日期命名文件，运行指标记入同一个run_id
+    os.environ['TODAY'] = date
+    os.environ['METRICS_RUN_ID'] = metrics.METRICS_RUN_ID
+
+    cache = ArtifactCache(PIPELINE_CACHE_DIR)
+    pipeline = Pipeline(build_daily_stages(date, args.markdown_only), cache, force=args.force)
+    status = pipeline.run()
+
+    removed = cache.prune(PIPELINE_CACHE_MAX_AGE_DAYS)
+    if removed:
+        log(f"清理过期缓存 {removed} 条")
+    removed = http_client.prune_cache()
+    if removed:
+        log(f"清理过期HTTP响应缓存 {removed} 条")
+
+    log("结果: " + ", ".join(f"{name}={state}" for name, state in status.items()))
+    report = metrics.report_path()
+    if report:
+        log(f"运行报告: {report}，汇总: python metrics.py {report}")
+    if any(state in ("failed", "skipped") for state in status.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,211 @@
 import json
 import os
 import sys
-import requests
 import time
 import random
 import hashlib
 import hmac
 import base64
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from email.utils import parsedate_to_datetime
 from requests.exceptions import RequestException
 
+import archive_store
+import http_client
+import metrics
+from degraded import mark_degraded
+
 # 智谱AI API (ZhipuAI) 配置
-ZHIPU_API_URL = "https://open.bigmodel.cn/api/paas/v4/chat/completions"
+ZHIPU_API_URL = os.environ.get("ZHIPU_API_URL", "https://open.bigmodel.cn/api/paas/v4/chat/completions")
 ZHIPU_API_KEY = os.environ.get("ZHIPU_API_KEY", "")
 ZHIPU_MODEL = os.environ.get("ZHIPU_MODEL", "glm-4-flash")  # 默认使用GLM-4-FLASH模型
 
 # 最大重试次数
 MAX_RETRIES = 3
+# 收到带Retry-After的429时的最大重试次数，这类重试不计入MAX_RETRIES
+MAX_RATE_LIMIT_RETRIES = 10
 # 重试间隔（秒）
 RETRY_DELAY = 2
+# 批量翻译时每次请求包含的最大文本段数，设为1则逐条翻译
+TRANSLATE_BATCH_SIZE = int(os.environ.get("TRANSLATE_BATCH_SIZE", "20"))
+
+# 并发与限速：同时在途的请求数、每秒请求数、每分钟token数（0表示不限制）
+TRANSLATE_CONCURRENCY = int(os.environ.get("TRANSLATE_CONCURRENCY", "4"))
+TRANSLATE_RPS = float(os.environ.get("TRANSLATE_RPS", "2"))
+TRANSLATE_TPM = int(os.environ.get("TRANSLATE_TPM", "0"))
+
+# 翻译记忆库（SQLite），相同原文不再重复请求
+TRANSLATION_MEMORY_PATH = os.environ.get("TRANSLATION_MEMORY_PATH", "translation_memory.db")  # 设为空字符串则禁用
+TRANSLATION_MEMORY_MAX_ENTRIES = int(os.environ.get("TRANSLATION_MEMORY_MAX_ENTRIES", "50000"))  # 超出后淘汰最久未使用的条目
+
+# 语言代码到提示语中语言名称的映射
+LANGUAGE_MAP = {
+    "zh": "中文",
+    "en": "英文",
+    "ja": "日语",
+    "ko": "韩语",
+    "fr": "法语",
+    "de": "德语",
+    "es": "西班牙语",
+    "ru": "俄语"
+}
+
+class TokenBucket:
+    """线程安全的令牌桶，rate为每秒补充的令牌数，rate<=0表示不限制"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, amount=1.0):
+        """取出amount个令牌，不足时阻塞等待"""
+        if self.rate <= 0:
+            return
+        amount = min(amount, self.capacity)  # 超过桶容量的请求在桶满时放行
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def drain(self, until):
+        """清空令牌，并从until时刻起重新按rate补充"""
+        with self.lock:
+            self.tokens = 0.0
+            self.updated = max(self.updated, until)
+
+class RateLimiter:
+    """
+    翻译请求限速器，所有并发的翻译请求共享
+    
+    同时限制每秒请求数和每分钟token数，收到429时按Retry-After暂停全部请求，
+    暂停结束后按配置的速率逐个恢复，而不是让等待中的请求同时发出
+    """
+
+    def __init__(self, requests_per_second, tokens_per_minute):
+        self.request_bucket = TokenBucket(requests_per_second, requests_per_second)
+        self.token_bucket = TokenBucket(tokens_per_minute / 60.0, tokens_per_minute)
+        self.resume_at = 0.0
+        self.lock = threading.Lock()
+
+    def pause(self, seconds):
+        """在接下来的seconds秒内不再发出新请求"""
+        with self.lock:
+            self.resume_at = max(self.resume_at, time.monotonic() + seconds)
+            resume_at = self.resume_at
+        self.request_bucket.drain(resume_at)
+
+    def acquire(self, tokens=0):
+        """等待直到可以发出一个预计消耗tokens个token的请求"""
+        while True:
+            with self.lock:
+                wait = self.resume_at - time.monotonic()
+            if wait <= 0:
+                break
+            time.sleep(wait)
+        self.request_bucket.acquire(1)
+        if tokens:
+            self.token_bucket.acquire(tokens)
+
+_rate_limiter = RateLimiter(TRANSLATE_RPS, TRANSLATE_TPM)
+
+# 本进程中未能翻译、保留原文的文本段数，用于判断产出是否为降级结果
+_failed_segments = 0
+_failed_segments_lock = threading.Lock()
+
+def _record_failed_segments(count=1):
+    global _failed_segments
+    with _failed_segments_lock:
+        _failed_segments += count
+
+class TranslationMemory:
+    """
+    以 hash(原文, 源语言, 目标语言, 模型) 为键的翻译记忆库
+    
+    存储在本地SQLite文件中，条目数超过上限时按最近使用时间淘汰
+    """
+
+    def __init__(self, path=TRANSLATION_MEMORY_PATH, max_entries=TRANSLATION_MEMORY_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT PRIMARY KEY, translation TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_last_used ON translations(last_used)")
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(text, source, target, model=None):
+        """计算翻译记忆的键"""
+        raw = "\x00".join([model or ZHIPU_MODEL, source, target, text])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get_many(self, keys):
+        """批量查询，返回命中的键到译文的映射，并刷新其使用时间"""
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        for start in range(0, len(unique_keys), 500):
+            chunk = unique_keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT key, translation FROM translations WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            found.update(rows)
+        if found:
+            now = time.time()
+            self.conn.executemany("UPDATE translations SET last_used = ? WHERE key = ?",
+                                  [(now, key) for key in found])
+            self.conn.commit()
+        return found
+
+    def put_many(self, items):
+        """批量写入 (键, 译文)，写入后按条目数上限淘汰"""
+        if not items:
+            return
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO translations (key, translation, last_used) VALUES (?, ?, ?)",
+            [(key, translation, now) for key, translation in items]
+        )
+        self._evict()
+        self.conn.commit()
+
+    def _evict(self):
+        """条目数超过上限时删除最久未使用的条目"""
+        count = self.conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self.conn.execute(
+                "DELETE FROM translations WHERE key IN "
+                "(SELECT key FROM translations ORDER BY last_used ASC LIMIT ?)", (excess,)
+            )
+
+    def close(self):
+        self.conn.close()
+
+def _open_translation_memory():
+    """打开翻译记忆库，未配置或打开失败时返回None"""
+    if not TRANSLATION_MEMORY_PATH:
+        return None
+    try:
+        return TranslationMemory(TRANSLATION_MEMORY_PATH, TRANSLATION_MEMORY_MAX_ENTRIES)
+    except sqlite3.Error as e:
+        print(f"打开翻译记忆库失败，将不使用缓存: {e}")
+        return None
 
 def translate_text(text, source="en", target="zh"):
     """
@@ -35,33 +222,68 @@ def translate_text(text, source="en", target="zh"):
     if not text or len(text.strip()) == 0:
         return text
     
-    # 随机延迟0.5-1秒，避免请求过于频繁
-    time.sleep(random.uniform(0.5, 1))
+    if not _has_credentials():
+        print("错误: 未配置智谱AI API密钥")
+        _record_failed_segments()
+        return text
+    
+    try:
+        return _call_with_retries(_translate_zhipu, text, source, target)
+    except RequestException:
+        print(f"达到最大重试次数，跳过翻译")
+        _record_failed_segments()
+        return text  # 所有尝试都失败，返回原文
+
+def _retry_after_seconds(error):
+    """从429响应的Retry-After头中解析等待秒数，没有时返回None"""
+    response = getattr(error, "response", None)
+    if response is None or response.status_code != 429:
+        return None
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def _call_with_retries(func, *args):
+    """
+    调用翻译请求函数，其他错误最多尝试MAX_RETRIES次
     
-    # 尝试翻译，最多重试MAX_RETRIES次
-    for attempt in range(MAX_RETRIES):
+    429响应按Retry-After暂停所有翻译请求后重试，最多MAX_RATE_LIMIT_RETRIES次，不占用MAX_RETRIES；
+    其他错误按次数递增延迟。全部失败时抛出最后一次的异常
+    """
+    attempt = 0
+    rate_limited = 0
+    while True:
         try:
-            if not ZHIPU_API_KEY:
-                print("错误: 未配置智谱AI API密钥")
-                return text
-                
-            return _translate_zhipu(text, source, target)
-            
+            return func(*args)
         except RequestException as e:
-            print(f"翻译时发生错误 (尝试 {attempt+1}/{MAX_RETRIES}): {str(e)}")
-            if attempt < MAX_RETRIES - 1:
-                # 每次重试增加延迟
-                delay = RETRY_DELAY * (attempt + 1) + random.uniform(0, 1)
-                print(f"等待 {delay:.2f} 秒后重试...")
-                time.sleep(delay)
-            else:
-                print(f"达到最大重试次数，跳过翻译")
-                return text
-    
-    return text  # 所有尝试都失败，返回原文
-
-def _generate_zhipu_token(api_key):
-    """生成智谱API的JWT Token"""
+            retry_after = _retry_after_seconds(e)
+            if retry_after is not None and rate_limited < MAX_RATE_LIMIT_RETRIES:
+                rate_limited += 1
+                metrics.incr("translate.retries", reason="rate_limited")
+                print(f"触发限流 ({rate_limited}/{MAX_RATE_LIMIT_RETRIES})，所有翻译请求暂停 {retry_after:.2f} 秒...")
+                _rate_limiter.pause(retry_after)
+                continue
+            attempt += 1
+            print(f"翻译时发生错误 (尝试 {attempt}/{MAX_RETRIES}): {str(e)}")
+            if attempt >= MAX_RETRIES:
+                metrics.incr("translate.failures")
+                raise
+            metrics.incr("translate.retries", reason="error")
+            # 每次重试增加延迟
+            delay = RETRY_DELAY * attempt + random.uniform(0, 1)
+            print(f"等待 {delay:.2f} 秒后重试...")
+            time.sleep(delay)
+
+def _generate_zhipu_token(api_key, timestamp=None, ttl=3600):
+    """生成智谱API的JWT Token，默认有效期1小时"""
     try:
         # API密钥格式: id.key
         parts = api_key.split('.')
@@ -79,8 +301,9 @@ def _generate_zhipu_token(api_key):
         header_str = base64.b64encode(json.dumps(header, separators=(',', ':')).encode('utf-8')).decode('utf-8').rstrip('=')
         
         # 生成Payload
-        timestamp = int(time.time())
-        expiration = timestamp + 3600  # 令牌过期时间为1小时
+        if timestamp is None:
+            timestamp = int(time.time())
+        expiration = timestamp + ttl
         payload = {
             "api_key": api_id,
             "exp": expiration,
@@ -101,36 +324,69 @@ def _generate_zhipu_token(api_key):
         print(f"生成智谱API Token时出错: {e}")
         return None
 
-def _translate_zhipu(text, source, target):
-    """使用智谱AI API进行翻译"""
-    # 生成授权Token
-    token = _generate_zhipu_token(ZHIPU_API_KEY)
-    if not token:
-        raise Exception("无法生成智谱API授权Token")
-    
-    # 准备请求标头
-    headers = {
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {token}'
-    }
-    
-    # 构建提示语
-    language_map = {
-        "zh": "中文",
-        "en": "英文",
-        "ja": "日语",
-        "ko": "韩语",
-        "fr": "法语",
-        "de": "德语",
-        "es": "西班牙语",
-        "ru": "俄语"
-    }
+class ZhipuTokenProvider:
+    """
+    智谱API鉴权：缓存签名后的JWT，在过期前refresh_margin秒内重新签名
     
-    source_lang = language_map.get(source, source)
-    target_lang = language_map.get(target, target)
+    所有翻译线程共享同一个实例；更换鉴权方式时只需提供同样带有get_auth_headers方法的对象
+    """
+
+    def __init__(self, api_key, ttl=3600, refresh_margin=300):
+        self.api_key = api_key
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.token = None
+        self.expires_at = 0
+        self.lock = threading.Lock()
+
+    def get_token(self):
+        """返回有效的Token，无法生成时返回None"""
+        with self.lock:
+            now = int(time.time())
+            if self.token is None or now >= self.expires_at - self.refresh_margin:
+                self.token = _generate_zhipu_token(self.api_key, timestamp=now, ttl=self.ttl)
+                self.expires_at = now + self.ttl if self.token else 0
+            return self.token
+
+    def get_auth_headers(self):
+        """返回请求所需的鉴权头"""
+        token = self.get_token()
+        if not token:
+            raise Exception("无法生成智谱API授权Token")
+        return {'Authorization': f'Bearer {token}'}
+
+_auth_provider = None
+_custom_auth_provider = False  # 是否通过set_auth_provider安装了自定义鉴权
+_auth_provider_lock = threading.Lock()
+
+def get_auth_provider():
+    """获取共享的鉴权提供者，未设置时按ZHIPU_API_KEY创建默认的ZhipuTokenProvider"""
+    global _auth_provider
+    with _auth_provider_lock:
+        if _auth_provider is None:
+            _auth_provider = ZhipuTokenProvider(ZHIPU_API_KEY)
+        return _auth_provider
+
+def set_auth_provider(provider):
+    """替换鉴权提供者，例如改用其他鉴权方式；传入None恢复默认"""
+    global _auth_provider, _custom_auth_provider
+    with _auth_provider_lock:
+        _auth_provider = provider
+        _custom_auth_provider = provider is not None
+
+def _has_credentials():
+    """配置了API密钥或安装了自定义鉴权时才发送翻译请求"""
+    return _custom_auth_provider or bool(ZHIPU_API_KEY)
+
+def _zhipu_chat(prompt, timeout=20):
+    """向智谱AI发送单轮对话请求，返回回复内容，没有回复时返回None"""
+    # 按提示语长度粗略估算输入和输出的token数
+    with metrics.span("translate.throttle"):
+        _rate_limiter.acquire(tokens=len(prompt))
     
-    # 构建聊天消息
-    prompt = f"请将以下{source_lang}翻译成{target_lang}，只返回翻译结果，不要包含解释或其他内容：\n\n{text}"
+    # 准备请求标头，Token在限速等待之后获取，保证发出时仍然有效
+    headers = {'Content-Type': 'application/json'}
+    headers.update(get_auth_provider().get_auth_headers())
     
     payload = {
         "model": ZHIPU_MODEL,
@@ -144,15 +400,176 @@ def _translate_zhipu(text, source, target):
         "stream": False
     }
     
-    response = requests.post(ZHIPU_API_URL, headers=headers, json=payload, timeout=20)
+    response = http_client.post(ZHIPU_API_URL, headers=headers, json=payload, timeout=timeout)
     response.raise_for_status()
     
     result = response.json()
     if "choices" in result and len(result["choices"]) > 0:
-        translation = result["choices"][0]["message"]["content"].strip()
-        return translation
+        return result["choices"][0]["message"]["content"].strip()
     
-    return text
+    return None
+
+def _translate_zhipu(text, source, target):
+    """使用智谱AI API进行翻译"""
+    source_lang = LANGUAGE_MAP.get(source, source)
+    target_lang = LANGUAGE_MAP.get(target, target)
+    
+    # 构建聊天消息
+    prompt = f"请将以下{source_lang}翻译成{target_lang}，只返回翻译结果，不要包含解释或其他内容：\n\n{text}"
+    
+    translation = _zhipu_chat(prompt)
+    return translation if translation is not None else text
+
+def _translate_zhipu_batch(texts, source, target):
+    """
+    在一次请求中翻译多段文本
+    
+    文本以编号的JSON对象发送，要求模型返回相同编号的JSON对象
+    
+    Returns:
+        编号(从0开始的下标)到译文的映射，解析失败的段落不包含在内
+    """
+    source_lang = LANGUAGE_MAP.get(source, source)
+    target_lang = LANGUAGE_MAP.get(target, target)
+    
+    segments = {str(i + 1): text for i, text in enumerate(texts)}
+    prompt = (
+        f"请将下面JSON对象中每个值从{source_lang}翻译成{target_lang}。"
+        f"返回一个JSON对象，键与输入完全相同，值为对应的译文。"
+        f"只返回JSON，不要包含解释或其他内容：\n\n"
+        f"{json.dumps(segments, ensure_ascii=False)}"
+    )
+    
+    # 段数越多回复越长，相应放宽超时
+    content = _zhipu_chat(prompt, timeout=20 + 2 * len(texts))
+    return _parse_batch_translation(content, len(texts))
+
+def _parse_batch_translation(content, count):
+    """解析批量翻译的回复，返回下标到译文的映射"""
+    if not content:
+        return {}
+    
+    # 去掉可能包裹的Markdown代码块，截取最外层的JSON对象
+    content = re.sub(r'^```(?:json)?\s*|\s*```$', '', content.strip())
+    start, end = content.find('{'), content.rfind('}')
+    if start == -1 or end <= start:
+        return {}
+    
+    try:
+        parsed = json.loads(content[start:end + 1])
+    except ValueError:
+        return {}
+    if not isinstance(parsed, dict):
+        return {}
+    
+    translations = {}
+    for i in range(count):
+        value = parsed.get(str(i + 1))
+        if isinstance(value, str) and value.strip():
+            translations[i] = value.strip()
+    return translations
+
+def translate_batch(texts, source="en", target="zh", memory=None):
+    """
+    批量翻译多段文本，每TRANSLATE_BATCH_SIZE段合并为一次请求
+    
+    先查询翻译记忆库，只有未命中的文本才会发送请求，成功的译文写回记忆库。
+    回复中无法解析的段落退回逐条翻译；请求本身失败时保留原文，与translate_text一致
+    
+    Args:
+        texts: 要翻译的文本列表
+        source: 源语言代码
+        target: 目标语言代码
+        memory: 翻译记忆库，为None时不使用缓存
+        
+    Returns:
+        与输入顺序一致的译文列表
+    """
+    results = list(texts)
+    pending = [i for i, text in enumerate(texts) if text and text.strip()]
+    
+    if memory is not None and pending:
+        keys = {i: memory.make_key(texts[i], source, target) for i in pending}
+        cached = memory.get_many(list(keys.values()))
+        for i in pending:
+            if keys[i] in cached:
+                results[i] = cached[keys[i]]
+        pending = [i for i in pending if keys[i] not in cached]
+        print(f"翻译记忆库命中 {len(keys) - len(pending)}/{len(keys)} 段文本")
+        metrics.incr("translate.memory_hits", len(keys) - len(pending))
+        metrics.incr("translate.memory_misses", len(pending))
+    
+    # 同一批次中重复的原文只翻译一次
+    translated = _translate_pending(texts, _unique_by_text(texts, pending), source, target)
+    for i in pending:
+        results[i] = translated.get(texts[i], texts[i])
+    
+    # 只记录成功的译文，失败时返回的原文不写入
+    if memory is not None:
+        memory.put_many([(memory.make_key(text, source, target), translation)
+                         for text, translation in translated.items() if translation != text])
+    return results
+
+def _unique_by_text(texts, indices):
+    """去掉原文重复的下标，保留第一次出现的"""
+    seen = set()
+    unique = []
+    for i in indices:
+        if texts[i] not in seen:
+            seen.add(texts[i])
+            unique.append(i)
+    return unique
+
+def _translate_pending(texts, pending, source, target):
+    """
+    通过网络翻译指定下标的文本
+    
+    Returns:
+        原文到译文的映射，请求失败的文本不包含在内
+    """
+    results = {}
+    
+    if not pending:
+        return results
+    
+    if not _has_credentials():
+        print("错误: 未配置智谱AI API密钥")
+        _record_failed_segments(len(pending))
+        return results
+    
+    # 多个请求同时在途，由共享的限速器控制速率；结果按原文回填，顺序与输入一致
+    with ThreadPoolExecutor(max_workers=max(1, TRANSLATE_CONCURRENCY)) as executor:
+        if TRANSLATE_BATCH_SIZE <= 1:
+            translations = executor.map(lambda i: translate_text(texts[i], source, target), pending)
+            for i, translation in zip(pending, translations):
+                results[texts[i]] = translation
+            return results
+        
+        chunks = [pending[start:start + TRANSLATE_BATCH_SIZE] for start in range(0, len(pending), TRANSLATE_BATCH_SIZE)]
+        print(f"将 {len(pending)} 段文本分为 {len(chunks)} 批翻译，最多 {TRANSLATE_CONCURRENCY} 个请求并发")
+        for chunk_results in executor.map(lambda chunk: _translate_chunk(texts, chunk, source, target), chunks):
+            results.update(chunk_results)
+    
+    return results
+
+def _translate_chunk(texts, chunk, source, target):
+    """翻译一批文本，解析失败的段落单独翻译，返回原文到译文的映射"""
+    try:
+        translations = _call_with_retries(_translate_zhipu_batch, [texts[i] for i in chunk], source, target)
+    except RequestException:
+        print("达到最大重试次数，本批文本保留原文")
+        _record_failed_segments(len(chunk))
+        return {}
+    
+    results = {}
+    for offset, i in enumerate(chunk):
+        if offset in translations:
+            results[texts[i]] = translations[offset]
+        else:
+            print(f"第 {i + 1} 段批量译文解析失败，改为单独翻译")
+            metrics.incr("translate.batch_parse_failures")
+            results[texts[i]] = translate_text(texts[i], source, target)
+    return results
 
 def translate_news_file(news_file):
     """
@@ -186,39 +603,52 @@ def translate_news_file(news_file):
         
         if not articles:
             print("警告: 没有找到文章，将创建空的中文文件")
-            today_str = datetime.now().strftime("%Y-%m-%d")
+            today_str = os.environ.get('TODAY', datetime.now().strftime("%Y-%m-%d"))
             cn_filename = f"ai_news_cn_{today_str}.json"
             with open(cn_filename, 'w', encoding='utf-8') as f:
                 json.dump({"articles": [], "hot_keywords": data.get("hot_keywords", {})}, f, ensure_ascii=False, indent=4)
             return cn_filename
             
-        # 翻译文章，每篇输出进度
+        # 翻译文章，标题和描述合并为批量请求
         translated_articles = []
         total = len(articles)
         
         print(f"开始翻译 {total} 篇文章...")
         
+        segments = []
+        for article in articles:
+            segments.append(article["title"])
+            segments.append(article["description"])
+        memory = _open_translation_memory()
+        failed_before = _failed_segments
+        try:
+            with metrics.span("translate.batch") as span:
+                translations = translate_batch(segments, memory=memory)
+                span.fields["segments"] = len(segments)
+                span.fields["translated"] = sum(1 for a, b in zip(segments, translations) if a != b)
+        finally:
+            if memory is not None:
+                memory.close()
+        failed = _failed_segments - failed_before
+        if failed:
+            mark_degraded(f"{failed} 段文本未能翻译，保留原文")
+        
         for i, article in enumerate(articles):
-            print(f"正在翻译文章 {i+1}/{total}: {article['title'][:40]}...")
-                
-            # 翻译标题和描述
             translated_article = article.copy()
             
             # 这里可以删除处理过程中添加的评分字段，避免在PDF中显示
             if 'score' in translated_article:
                 del translated_article['score']
             
-            # 翻译标题
-            translated_article["title"] = translate_text(article["title"])
-            
-            # 翻译描述
-            translated_article["description"] = translate_text(article["description"])
+            # 标题和描述按顺序对应
+            translated_article["title"] = translations[2 * i]
+            translated_article["description"] = translations[2 * i + 1]
             
             # 源网站名称不翻译
             translated_articles.append(translated_article)
             
         # 保存翻译后的文章，保持原有的数据结构
-        today_str = datetime.now().strftime("%Y-%m-%d")
+        today_str = os.environ.get('TODAY', datetime.now().strftime("%Y-%m-%d"))
         cn_filename = f"ai_news_cn_{today_str}.json"
         
         output_data = {
@@ -228,6 +658,9 @@ def translate_news_file(news_file):
         
         with open(cn_filename, 'w', encoding='utf-8') as f:
             json.dump(output_data, f, ensure_ascii=False, indent=4)
+        
+        digest = archive_store.digest_from_filename(news_file)
+        archive_store.append_digest(digest[0] if digest else today_str, "zh", output_data)
             
         print(f"翻译完成! 已保存到 {cn_filename}")
         return cn_filename